@@ -1,31 +1,93 @@
-from flask import Flask, redirect, request, session, render_template, jsonify, send_from_directory
-from werkzeug.utils import secure_filename
 import os
+from .startup import ImportTimer
+
+# STARTUP_REPORT=1 prints per-module import cost once create_app() is done
+import_timer = ImportTimer().install() if os.environ.get('STARTUP_REPORT') == '1' else None
+
+from flask import Flask, Response, redirect, request, session, render_template, jsonify, send_file
+from werkzeug.security import safe_join
 import json
+import mimetypes
+from stat import S_ISREG
 from datetime import datetime, timedelta
-import google.generativeai as genai
+from .journal import Journal
+from .store import ApplicationStore
+from .counters import ApplicationCounters
+from .pagination import MAX_LIMIT, wants_page, parse_page_args, page_response
+from .events import EventBus, stream
+from .search import SearchIndex
+from .blobstore import BlobStore
+from .previews import PreviewWorker, VARIANTS
+from .ai import Verifier, StubModel, gemini_model, stream_text
+from .intents import IntentRouter
+from .i18n import catalog
+from .pagecache import PageCache
+from .jobs import JobQueue
+from .geo import GeoIndex, parse_rings
+from . import geometry
+from .tiles import TileCache, MAX_ZOOM
+from .gazetteer import Gazetteer
 
 # 🔥 GLOBAL VARIABLES - NO MORE UNBOUNDLOCALERROR!
-applications = []
+applications = ApplicationStore()
+counters = ApplicationCounters()
+events = EventBus()
+search_index = SearchIndex()
+geo_index = GeoIndex()
 next_ref_id = 1
 DATA_FILE = 'patta_data.json'
+JOURNAL_FILE = 'patta_data.journal'
 GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY', None)
 
+# 🔥 WRITE-AHEAD LOG - one line per mutation, compacted into DATA_FILE
+journal = Journal(DATA_FILE, JOURNAL_FILE)
+
 def load_data():
-    global applications, next_ref_id
+    global next_ref_id
+    snapshot = None
     if os.path.exists(DATA_FILE):
         try:
-            with open(DATA_FILE, 'r') as f:
-                data = json.load(f)
-                applications = data.get('applications', [])
-                next_ref_id = data.get('next_ref_id', 1)
-            print(f"✅ LOADED {len(applications)} saved applications")
-            return
+            snapshot = journal.read_snapshot()
         except Exception as e:
             print(f"❌ Load failed: {e}")
-    
+
+    if snapshot is not None:
+        loaded = snapshot.get('applications', [])
+        next_ref_id = snapshot.get('next_ref_id', 1)
+        print(f"✅ LOADED {len(loaded)} saved applications")
+    else:
+        loaded = load_test_data()
+
+    # 🔥 REPLAY JOURNAL TAIL ON TOP OF THE SNAPSHOT
+    by_ref = {a.get('ref_id'): a for a in loaded}
+    replayed = 0
+    for record in journal.read_records((snapshot or {}).get('journal_seq', 0)):
+        if record.get('op') == 'put':
+            by_ref[record['application'].get('ref_id')] = record['application']
+        elif record.get('op') == 'delete':
+            by_ref.pop(record.get('ref_id'), None)
+        next_ref_id = max(next_ref_id, record.get('next_ref_id', next_ref_id))
+        replayed += 1
+    if replayed:
+        print(f"✅ REPLAYED {replayed} journal records")
+
+    # 🔥 COMPACT BOUNDARIES - older records stored raw coordinate lists
+    for application in by_ref.values():
+        compact_boundary(application)
+
+    applications.load(list(by_ref.values()))
+
+def compact_boundary(application):
+    """Store the boundary as encoded polylines (see geometry.encode_boundary)"""
+    boundary = application.get('boundary')
+    if boundary and not geometry.is_encoded(boundary):
+        rings = parse_rings(boundary)
+        application['boundary'] = geometry.encode_boundary(rings) if rings else []
+
+def load_test_data():
+    global next_ref_id
     # 🔥 TEST DATA - 2 PERFECT APPLICATIONS
-    applications = [
+    test_applications = [
         {
             'ref_id': 'PATTA-20251228-0001',
             'citizen_email': 'citizen@test.com',
@@ -56,154 +118,284 @@ def load_data():
     ]
     next_ref_id = 3
     print("✅ TEST DATA loaded - 2 applications ready!")
+    return test_applications
+
+def save_data(app, application):
+    """Journal one changed application (DATA_FILE is only rewritten by compaction)"""
+    try:
+        journal.append({
+            'op': 'put',
+            'application': application,
+            'next_ref_id': app.next_ref_id
+        })
+    except Exception as e:
+        print(f"❌ Save failed: {e}")
 
-def save_data():
-    global applications, next_ref_id
+def delete_data(app, ref_id):
     try:
-        with open(DATA_FILE, 'w') as f:
-            json.dump({
-                'applications': applications,
-                'next_ref_id': next_ref_id
-            }, f, indent=2)
-        print("💾 Data saved successfully")
+        journal.append({'op': 'delete', 'ref_id': ref_id, 'next_ref_id': app.next_ref_id})
     except Exception as e:
         print(f"❌ Save failed: {e}")
 
+def snapshot_data(app):
+    return {
+        'applications': [dict(a) for a in app.applications],
+        'next_ref_id': app.next_ref_id
+    }
+
+def days_pending(submitted_at):
+    if not submitted_at:
+        return 0
+    try:
+        submitted = datetime.fromisoformat(submitted_at.replace('Z', '+00:00'))
+        return max(0, (datetime.now() - submitted).days)
+    except:
+        return 0
+
+def safe_application(app_data):
+    """Admin view of one application, or None if the record is broken"""
+    try:
+        return {
+            'ref_id': app_data.get('ref_id', 'N/A'),
+            'citizen_email': app_data.get('citizen_email', 'Unknown'),
+            'village': app_data.get('village', 'N/A'),
+            'taluk': app_data.get('taluk', 'N/A'),
+            'district': app_data.get('district', 'N/A'),
+            'surveyNo': app_data.get('surveyNo', 'N/A'),
+            'subdivNo': app_data.get('subdivNo', ''),
+            'status': app_data.get('status', 'pending'),
+            'submitted_at': app_data.get('submitted_at'),
+            'days_pending': days_pending(app_data.get('submitted_at')),
+            'rev': app_data.get('rev', 0),
+            'gemini_analysis': app_data.get('gemini_analysis'),
+            'documents': app_data.get('documents', {})
+        }
+    except:
+        return None
+
+def application_filter(args):
+    """Predicate for the status query param, or None if unfiltered"""
+    status = args.get('status', '')
+    if not status:
+        return None
+    return lambda a: a.get('status') == status
+
+def search_applications(app, args, limit):
+    """Ranked hits for ?search= (ref_id, survey/subdiv no, village, taluk, email)"""
+    status = args.get('status', '')
+    accept = None
+    if status:
+        accept = lambda ref_id: app.applications.get(ref_id).get('status') == status
+    ref_ids = app.search_index.search(args.get('search', ''), limit, accept)
+    return [app.applications.get(ref_id) for ref_id in ref_ids]
+
+def filtered_total(app, args, hits=None):
+    """Total matching rows (search totals are just the ranked hits returned)"""
+    if args.get('search'):
+        return hits
+    status = args.get('status')
+    return app.counters.status(status) if status else app.counters.total
+
+def application_changes(app, args, view=None, **extra):
+    """Delta-sync response for ?since=<rev>: changed records plus tombstones"""
+    try:
+        since = int(args.get('since', 0))
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Invalid since'}), 400
+    rev = app.applications.rev
+    changed, removed, reset = app.applications.changes_since(since)
+    if view:
+        changed = [a for a in (view(c) for c in changed) if a]
+    return jsonify(dict({
+        'rev': max([rev] + [c.get('rev', 0) for c in changed]),
+        'reset': reset,
+        'changed': changed,
+        'deleted': removed,
+        'counts': app.counters.snapshot()['by_status']
+    }, **extra))
+
+def verify_application(app, ref_id, analyzed_by=None):
+    """Run (or reuse) the AI analysis for one application and store it"""
+    app_item = app.applications.get(ref_id)
+    if not app_item:
+        raise LookupError(f"Application {ref_id} not found")
+
+    # shared client; concurrent clicks on the same inputs share one call
+    ai_analysis, input_hash, cached = app.verifier.verify(app_item)
+
+    if (app_item.get('gemini_analysis') or {}).get('input_hash') != input_hash:
+        app.applications.update(ref_id, {'gemini_analysis': {
+            'analysis': ai_analysis,
+            'analyzed_by': analyzed_by,
+            'analyzed_at': datetime.now().isoformat(),
+            'input_hash': input_hash
+        }})
+        save_data(app, app_item)
+    return ai_analysis, cached
+
 def create_app():
     app = Flask(__name__)
     app.secret_key = 'patta-super-secret-2025'
     
+    # Load data (snapshot + journal) before attaching it
+    load_data()
+
     # 🔥 ATTACH GLOBAL STATE TO APP
     app.applications = applications
     app.next_ref_id = next_ref_id
+    counters.attach(applications)
+    app.counters = counters
+    events.attach(applications)
+    app.events = events
+    search_index.attach(applications)
+    app.search_index = search_index
+    geo_index.attach(applications)
+    app.geo_index = geo_index
+    app.tiles = TileCache(geo_index, applications)
+    app.tiles.attach(applications)
+    app.gazetteer = Gazetteer()
+    journal.open(lambda: snapshot_data(app))
     
     # 🔥 GEMINI AI CONFIG
     global GEMINI_API_KEY
+    app.verifier = None
     if GEMINI_API_KEY:
-        genai.configure(api_key=GEMINI_API_KEY)
+        # the SDK is imported when the first verify/chat needs it
+        app.verifier = Verifier(lambda: gemini_model(GEMINI_API_KEY))
         print("✅ Gemini AI READY")
+    elif os.environ.get('GEMINI_STUB') == '1':
+        app.verifier = Verifier(StubModel, model_name='stub')
+        print("🧪 Gemini stub model - offline AI verify")
     else:
         print("⚠️ GEMINI_API_KEY missing - AI features disabled")
+    if app.verifier:
+        app.verifier.attach(applications)
+    app.intents = IntentRouter(counters)
+    app.pages = PageCache(app)
+    app.config['CHAT_LLM_FALLBACK'] = os.environ.get('CHAT_LLM_FALLBACK') == '1'
+
+    # 🔥 BACKGROUND AI JOBS (bulk verify at a controlled rate)
+    app.jobs = JobQueue(
+        'ai_jobs.json',
+        workers=int(os.environ.get('AI_JOB_WORKERS', 2)),
+        per_minute=int(os.environ.get('AI_JOBS_PER_MINUTE', 60))
+    )
+    app.jobs.register('verify', lambda job: {
+        'cached': verify_application(app, job['ref_id'], job['requested_by'])[1]
+    })
+    # throttled per-batch progress, only to admins (they start bulk runs)
+    app.jobs.add_listener(lambda progress: app.events.publish(dict(progress, type='job', admin_only=True)))
+    if app.verifier:
+        app.jobs.open()
     
     # 🔥 UPLOADS FOLDER
     UPLOAD_FOLDER = 'uploads'
     app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
     os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-    
-    # Load data on startup
-    load_data()
+    # the blob manifest sits next to DATA_FILE, never inside the served folder
+    app.blobs = BlobStore(os.path.abspath(UPLOAD_FOLDER), os.path.dirname(os.path.abspath(DATA_FILE))).open()
+    app.previews = PreviewWorker(app.blobs, int(os.environ.get('PREVIEW_WORKERS', 2)))
+    app.config['USE_X_SENDFILE'] = os.environ.get('UPLOADS_X_SENDFILE') == '1'
+    app.config['UPLOADS_ACCEL_PREFIX'] = os.environ.get('UPLOADS_ACCEL_PREFIX')
+
+    # 🔥 MAP TILES - build the zoomed-out tiles before anyone asks
+    warm_zoom = int(os.environ.get('TILE_WARM_ZOOM', 8))
+    if warm_zoom >= 0 and len(app.geo_index):
+        app.tiles.warm(warm_zoom)
+
+    # 🔥 LIVE UPDATES - an open SSE stream holds a whole sync worker, so dashboards
+    # poll /changes unless the server runs threaded workers (gunicorn.conf.py sets LIVE_UPDATES=1)
+    app.config['LIVE_UPDATES'] = os.environ.get('LIVE_UPDATES') == '1'
+    app.config['SSE_MAX_SECONDS'] = int(os.environ.get('SSE_MAX_SECONDS', 55))
     
     # 🔥 CONTEXT PROCESSORS
     @app.context_processor
     def inject_session():
-        return dict(session=session)
+        return dict(session=session, live_updates=app.config['LIVE_UPDATES'])
 
     @app.context_processor
     def inject_language():
-        lang = request.cookies.get('lang', 'en')
-        languages = {
-    'en': {
-        'Patta Application': 'Patta Portal', 
-        'Logout': 'Logout',
-        'Track Applications': 'Track My Applications',
-        'Track My Applications': 'Track My Applications',
-        'Staff Dashboard - Patta Verification': 'Staff Dashboard - Patta Verification',
-        'Patta Verification Dashboard': 'Patta Verification Dashboard'
-    },
-    'ta': {
-        'Patta Application': 'பட்டா போர்டல்', 
-        'Logout': 'வெளியேறு',
-        'Track Applications': 'என் விண்ணப்பங்களைப் பின்தொடரவும்',
-        'Track My Applications': 'என் விண்ணப்பங்களைப் பின்தொடரவும்',
-        'Staff Dashboard - Patta Verification': 'பட்டா சரிபார்ப்பு டாஷ்போர்ட்',
-        'Patta Verification Dashboard': 'பட்டா சரிபார்ப்பு டாஷ்போர்ட்'
-    },
-    'kn': {
-        'Patta Application': 'ಪಟ್ಟಾ ಪೋರ್ಟಲ್',
-        'Logout': 'ಬಿಡಾ',
-        'Track Applications': 'ನನ್ನ ಅರ್ಜಿಗಳನ್ನು ಟ್ರ್ಯಾಕ್ ಮಾಡಿ',
-        'Track My Applications': 'ನನ್ನ ಅರ್ಜಿಗಳನ್ನು ಟ್ರ್ಯಾಕ್ ಮಾಡಿ',
-        'Staff Dashboard - Patta Verification': 'ಪಟ್ಟಾ ಪರಿಶೀಲನೆ ಸ್ಟಾಫ್ ಡ್ಯಾಶ್‌ಬೋರ್ಡ್',
-        'Patta Verification Dashboard': 'ಪಟ್ಟಾ ಪರಿಶೀಲನೆ ಡ್ಯಾಶ್‌ಬೋರ್ಡ್'
-    },
-    'te': {
-        'Patta Application': 'పట్టా పోర్టల్',
-        'Logout': 'లాగౌట్',
-        'Track Applications': 'నా అప్లికేషన్లను ట్రాక్ చేయండి',
-        'Track My Applications': 'నా అప్లికేషన్లను ట్రాక్ చేయండి',
-        'Staff Dashboard - Patta Verification': 'పట్టా ధృవీకరణ స్టాఫ్ డాష్‌బోర్డ్',
-        'Patta Verification Dashboard': 'పట్టా ధృవీకరణ డాష్‌బోర్డ్'
-    },
-    'ml': {
-        'Patta Application': 'പട്ട ഓർട്ടൽ',
-        'Logout': 'ലോഗൗട്ട്',
-        'Track Applications': 'എന്റെ അപേക്ഷകൾ ട്രാക്ക് ചെയ്യുക',
-        'Track My Applications': 'എന്റെ അപേക്ഷകൾ ട്രാക്ക് ചെയ്യുക',
-        'Staff Dashboard - Patta Verification': 'പട്ട സ്ഥിരീകരണ സ്റ്റാഫ് ഡാഷ്ബോർഡ്',
-        'Patta Verification Dashboard': 'പട്ട സ്ഥിരീകരണ ഡാഷ്ബോർഡ്'
-    },
-    'hi': {
-        'Patta Application': 'पट्टा पोर्टल',
-        'Logout': 'लॉग आउट',
-        'Track Applications': 'मेरे आवेदनों को ट्रैक करें',
-        'Track My Applications': 'मेरे आवेदनों को ट्रैक करें',
-        'Staff Dashboard - Patta Verification': 'पट्टा सत्यापन स्टाफ डैशबोर्ड',
-        'Patta Verification Dashboard': 'पट्टा सत्यापन डैशबोर्ड'
-    },
-    'bn': {
-        'Patta Application': 'পট্টা পোর্টাল',
-        'Logout': 'লগ আউট',
-        'Track Applications': 'আমার আবেদনগুলি ট্র্যাক করুন',
-        'Track My Applications': 'আমার আবেদনগুলি ট্র্যাক করুন',
-        'Staff Dashboard - Patta Verification': 'পট্টা যাচাই স্টাফ ড্যাশবোর্ড',
-        'Patta Verification Dashboard': 'পট্টা যাচাই ড্যাশবোর্ড'
-    },
-    'mr': {
-        'Patta Application': 'पट्टा पोर्टल',
-        'Logout': 'बाहेर पडा',
-        'Track Applications': 'माझ्या अर्जांचा मागोवा घ्या',
-        'Track My Applications': 'माझ्या अर्जांचा मागोवा घ्या',
-        'Staff Dashboard - Patta Verification': 'पट्टा तपासणी स्टाफ डॅशबोर्ड',
-        'Patta Verification Dashboard': 'पट्टा तपासणी डॅशबोर्ड'
-    },
-    'gu': {
-        'Patta Application': 'પટ્ટા પોર્ટલ',
-        'Logout': 'લૉગઆઉટ',
-        'Track Applications': 'મારા અરજીઓ ટ્રેક કરો',
-        'Track My Applications': 'મારા અરજીઓ ટ્રેક કરો',
-        'Staff Dashboard - Patta Verification': 'પટ્ટા ચકાસણી સ્ટાફ ડેશબોર્ડ',
-        'Patta Verification Dashboard': 'પટ્ટા ચકાસણી ડેશબોર્ડ'
-    },
-    'pa': {
-        'Patta Application': 'ਪਟਟਾ ਪੋਰਟਲ',
-        'Logout': 'ਲੌਗ ਆਊਟ',
-        'Track Applications': 'ਮੇਰੀਆਂ ਅਰਜ਼ੀਆਂ ਟਰੈਕ ਕਰੋ',
-        'Track My Applications': 'ਮੇਰੀਆਂ ਅਰਜ਼ੀਆਂ ਟਰੈਕ ਕਰੋ',
-        'Staff Dashboard - Patta Verification': 'ਪਟਟਾ ਜਾਂਚ ਸਟਾਫ਼ ਡੈਸ਼ਬੋਰਡ',
-        'Patta Verification Dashboard': 'ਪਟਟਾ ਜਾਂਚ ਡੈਸ਼ਬੋਰਡ'
-    }
-}
-
+        # per-locale tables are loaded once, see i18n.Catalog
+        code = catalog.resolve(request.cookies.get('lang', 'en'))
+        return dict(lang=catalog.get(code), current_lang=code,
+                    t=lambda key, default=None: catalog.gettext(code, key, default))
+
+    # 🔥 FILE SERVER - strong ETags, 304s, Range requests, optional X-Sendfile/X-Accel-Redirect
+    upload_dir = os.path.abspath(UPLOAD_FOLDER)
+
+    def is_legacy_upload(filename):
+        # pre-CAS uploads were stored flat as {ref_id}_{doc}_{filename}
+        return '/' not in filename and not filename.startswith(('.', 'manifest.'))
+
+    def may_read_upload(filename):
+        """Staff/admin read any document; a citizen only those of their own applications"""
+        role = session.get('role')
+        if role in ['staff', 'admin']:
+            return True
+        url = f"/uploads/{filename}"
+        return role == 'citizen' and any(
+            url in (item.get('documents') or {}).values()
+            for item in app.applications.by_email(session.get('email', '')))
 
-        return dict(lang=languages.get(lang, languages['en']), current_lang=lang)
-
-    # 🔥 FILE SERVER
     @app.route('/uploads/<path:filename>')
     def uploaded_file(filename):
-        if '..' in filename or filename.startswith('/') or not filename:
+        if session.get('role') not in ['citizen', 'staff', 'admin']:
             return "Access Denied", 403
-        
-        upload_dir = os.path.abspath('uploads')
-        file_path = os.path.join(upload_dir, filename)
-        
-        if not os.path.abspath(file_path).startswith(upload_dir):
+        file_path = safe_join(upload_dir, filename)
+        if not filename or file_path is None:
             return "Access Denied", 403
-        
-        if not os.path.isfile(file_path):
+        # only stored documents: cas/<xx>/<known object> or a legacy flat upload
+        if not (app.blobs.is_object(filename) or is_legacy_upload(filename)):
+            return "File not found", 404
+        if not may_read_upload(filename):
+            return "File not found", 404
+
+        # ?variant=thumb|preview - downscaled JPEG derived in the background
+        variant = request.args.get('variant')
+        if variant:
+            name = app.blobs.object_name(filename)
+            if variant not in VARIANTS or not name:
+                return "File not found", 404
+            if not app.previews.ready(name, variant):
+                app.previews.submit(name)
+                return "Preview not ready", 404, {'Retry-After': '5'}
+            file_path = app.previews.path(name, variant)
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return "File not found", 404
+        if not S_ISREG(stat.st_mode):
             return "File not found", 404
-        
-        print(f"✅ Serving: {filename}")
-        return send_from_directory(upload_dir, filename, as_attachment=False)
+
+        if app.blobs.is_object(filename):
+            # Content-addressed: the name is the hash, so the bytes never change
+            etag = os.path.splitext(os.path.basename(filename))[0]
+            if variant:
+                etag = f"{etag}-{variant}"
+            max_age = 31536000
+        else:
+            etag = f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+            max_age = 3600
+
+        accel_prefix = app.config.get('UPLOADS_ACCEL_PREFIX')
+        if accel_prefix:
+            # nginx streams the bytes (and handles Range); the worker only answers 304s
+            served = os.path.relpath(file_path, upload_dir).replace(os.sep, '/')
+            response = Response(mimetype=mimetypes.guess_type(served)[0] or 'application/octet-stream')
+            response.headers['X-Accel-Redirect'] = accel_prefix.rstrip('/') + '/' + served
+            response.set_etag(etag)
+            response.last_modified = stat.st_mtime
+            response = response.make_conditional(request)
+        else:
+            # send_file handles If-None-Match/If-Modified-Since, Range and USE_X_SENDFILE
+            response = send_file(file_path, conditional=True, etag=etag,
+                                 last_modified=stat.st_mtime, max_age=max_age)
+        response.cache_control.public = False
+        response.cache_control.private = True
+        response.cache_control.max_age = max_age
+        if max_age == 31536000:
+            response.cache_control.immutable = True
+        return response
 
     # 🔥 HOME
     @app.route('/', methods=['GET', 'POST'])
@@ -256,7 +448,7 @@ def create_app():
     def citizen():
         if session.get('role') != 'citizen': return redirect('/')
         try:
-            return render_template('citizen.html')
+            return app.pages.render('citizen.html')
         except:
             return '<h1 style="padding:4rem;font-family:Arial;">👤 Citizen Dashboard</h1>'
 
@@ -264,7 +456,7 @@ def create_app():
     def staff():
         if session.get('role') not in ['staff', 'admin']: return redirect('/')
         try:
-            return render_template('staff.html')
+            return app.pages.render('staff.html')
         except:
             return '<h1 style="padding:4rem;font-family:Arial;">🛡️ Staff Dashboard</h1>'
 
@@ -272,7 +464,7 @@ def create_app():
     def admin():
         if session.get('role') != 'admin': return redirect('/')
         try:
-            return render_template('admin.html')
+            return app.pages.render('admin.html')
         except:
             return '<h1 style="padding:4rem;font-family:Arial;">👑 Admin Dashboard</h1>'
 
@@ -282,38 +474,52 @@ def create_app():
         if session.get('role') != 'admin':
             return jsonify({'error': 'Admin only'}), 403
         
-        # 🔥 BULLETPROOF DATA PROCESSING
-        safe_apps = []
-        for app_data in app.applications:
-            try:
-                safe_app = {
-                    'ref_id': app_data.get('ref_id', 'N/A'),
-                    'citizen_email': app_data.get('citizen_email', 'Unknown'),
-                    'village': app_data.get('village', 'N/A'),
-                    'taluk': app_data.get('taluk', 'N/A'),
-                    'district': app_data.get('district', 'N/A'),
-                    'surveyNo': app_data.get('surveyNo', 'N/A'),
-                    'subdivNo': app_data.get('subdivNo', ''),
-                    'status': app_data.get('status', 'pending'),
-                    'days_pending': 0,
-                    'gemini_analysis': app_data.get('gemini_analysis'),
-                    'documents': app_data.get('documents', {})
-                }
-                
-                # Calculate days safely
-                submitted_at = app_data.get('submitted_at')
-                if submitted_at:
-                    try:
-                        submitted = datetime.fromisoformat(submitted_at.replace('Z', '+00:00'))
-                        safe_app['days_pending'] = max(0, (datetime.now() - submitted).days)
-                    except:
-                        safe_app['days_pending'] = 0
-                
-                safe_apps.append(safe_app)
-            except:
-                continue  # Skip broken apps
-        
-        return jsonify(safe_apps)
+        if not wants_page(request.args):
+            safe_apps = [safe_application(a) for a in app.applications]
+            return jsonify([a for a in safe_apps if a])  # Skip broken apps
+
+        # 🔥 PAGED - only the requested page is built and serialized
+        try:
+            page = parse_page_args(request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        rev = app.applications.rev
+        if request.args.get('search'):
+            # Search results are ranked by relevance: one page, no cursor
+            items, next_key = search_applications(app, request.args, page['limit']), None
+        else:
+            items, next_key = app.applications.page(
+                page['field'], page['descending'], page['after'], page['limit'],
+                predicate=application_filter(request.args)
+            )
+        safe_apps = [a for a in (safe_application(i) for i in items) if a]
+        return jsonify(page_response(page, safe_apps, next_key,
+                                     total=filtered_total(app, request.args, len(items)),
+                                     counts=app.counters.snapshot()['by_status'],
+                                     ai_analyzed=app.counters.ai_analyzed,
+                                     rev=rev))
+
+    # 🔥 ADMIN DELTA SYNC - only what changed since the client's last rev
+    @app.route('/api/admin/applications/changes')
+    def api_admin_application_changes():
+        if session.get('role') != 'admin':
+            return jsonify({'error': 'Admin only'}), 403
+        return application_changes(app, request.args, safe_application,
+                                   ai_analyzed=app.counters.ai_analyzed)
+
+    @app.route('/api/admin/applications/<ref_id>', methods=['DELETE'])
+    def api_admin_delete_application(ref_id):
+        if session.get('role') != 'admin':
+            return jsonify({'error': 'Admin only'}), 403
+        removed = app.applications.remove(ref_id)
+        if not removed:
+            return jsonify({'success': False, 'error': 'Application not found'}), 404
+        delete_data(app, ref_id)
+        for url in (removed.get('documents') or {}).values():
+            if url.startswith('/uploads/cas/'):
+                app.blobs.release(url)
+        print(f"🗑️ DELETED {ref_id}")
+        return jsonify({'success': True, 'ref_id': ref_id})
 
 
     # 🔥 STAFF API
@@ -322,18 +528,64 @@ def create_app():
         if session.get('role') not in ['staff', 'admin']:
             return jsonify({'success': False, 'error': 'Unauthorized'}), 403
 
-        search = request.args.get('search', '').upper()
+        search = request.args.get('search', '').strip()
         status = request.args.get('status', '')
+
+        if wants_page(request.args):
+            try:
+                page = parse_page_args(request.args)
+            except ValueError as e:
+                return jsonify({'success': False, 'error': str(e)}), 400
+            rev = app.applications.rev
+            if search:
+                items, next_key = search_applications(app, request.args, page['limit']), None
+            else:
+                items, next_key = app.applications.page(
+                    page['field'], page['descending'], page['after'], page['limit'],
+                    predicate=application_filter(request.args)
+                )
+            return jsonify(page_response(page, items, next_key,
+                                         total=filtered_total(app, request.args, len(items)),
+                                         counts=app.counters.snapshot()['by_status'],
+                                         rev=rev))
         
-        filtered = app.applications[:]
-        if search: 
-            filtered = [app for app in filtered if search in app.get('ref_id', '')]
-        if status: 
-            filtered = [app for app in filtered if app.get('status') == status]
+        if search:
+            filtered = search_applications(app, request.args, MAX_LIMIT)
+        else:
+            filtered = app.applications.find(status=status)
 
         print(f"🔍 STAFF API: Found {len(filtered)} applications")
         return jsonify(filtered)
 
+    # 🔥 STAFF DELTA SYNC
+    @app.route('/api/patta/applications/changes')
+    def api_application_changes():
+        if session.get('role') not in ['staff', 'admin']:
+            return jsonify({'success': False, 'error': 'Unauthorized'}), 403
+        return application_changes(app, request.args)
+
+    # 🔥 LIVE UPDATES (SSE) - dashboards pull /changes when an event arrives
+    @app.route('/api/events/stream')
+    def api_event_stream():
+        role = session.get('role')
+        if role not in ['citizen', 'staff', 'admin']:
+            return jsonify({'success': False, 'error': 'Unauthorized'}), 403
+        if not app.config['LIVE_UPDATES']:
+            return '', 204   # sync workers: EventSource stops reconnecting, the page polls
+
+        # Reconnected after missing events (or to a restarted worker)? resync first
+        last_id = request.headers.get('Last-Event-ID', '')
+        resync_rev = None
+        if last_id and (not last_id.isdigit() or int(last_id) != app.applications.rev):
+            resync_rev = app.applications.rev
+
+        subscriber = app.events.subscribe(role, session.get('email'))
+        return Response(
+            stream(app.events, subscriber, resync_rev, app.config['SSE_MAX_SECONDS']),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+
     # 🔥 CITIZEN API
     @app.route('/api/citizen/applications')
     def api_citizen_applications():
@@ -341,7 +593,7 @@ def create_app():
             return jsonify({'success': False, 'error': 'Citizen only'}), 403
         
         citizen_email = session.get('email', '').lower()
-        citizen_apps = [app for app in app.applications if app.get('citizen_email', '').lower() == citizen_email]
+        citizen_apps = app.applications.by_email(citizen_email)
         return jsonify(citizen_apps)
 
     # 🔥 SUBMIT APPLICATION
@@ -353,15 +605,26 @@ def create_app():
         district = request.form.get('district', '')
         taluk = request.form.get('taluk', '')
         village = request.form.get('village', '')
-        lat = request.form.get('lat', '0')
-        lng = request.form.get('lng', '0')
         survey_no = request.form.get('surveyNo', '')
         subdiv_no = request.form.get('subdivNo', '')
-        
+
+        # parse everything that can fail before any upload takes a blob reference
+        try:
+            lat = float(request.form.get('lat') or 0)
+            lng = float(request.form.get('lng') or 0)
+        except ValueError:
+            return jsonify({'success': False, 'error': 'Invalid lat/lng'}), 400
+        if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+            return jsonify({'success': False, 'error': 'Invalid lat/lng'}), 400
+
         try:
             boundary = json.loads(request.form.get('boundary', '[]'))
         except:
             boundary = []
+        rings = parse_rings(boundary)
+        problems = geometry.validate(rings) if boundary else []
+        if problems:
+            return jsonify({'success': False, 'error': f'Boundary: {problems[0]}', 'problems': problems}), 400
 
         files = {
             'parentDoc': request.files.get('parentDoc'),
@@ -378,13 +641,25 @@ def create_app():
         ref_id = f"PATTA-{datetime.now().strftime('%Y%m%d')}-{app.next_ref_id:04d}"
         app.next_ref_id += 1
 
+        # 🔥 STREAMED, HASHED, CONTENT-ADDRESSED - re-uploads cost no extra disk
         documents = {}
-        for doc_name, file in files.items():
-            if file and file.filename:
-                filename = secure_filename(f"{ref_id}_{doc_name}_{file.filename}")
-                filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-                file.save(filepath)
-                documents[doc_name] = f"/uploads/{filename}"
+        document_meta = {}
+        try:
+            for doc_name, file in files.items():
+                stored = app.blobs.put(file)
+                documents[doc_name] = stored['url']
+                document_meta[doc_name] = {
+                    'sha256': stored['sha256'],
+                    'size': stored['size'],
+                    'filename': stored['filename']
+                }
+        except Exception as e:
+            for url in documents.values():
+                app.blobs.release(url)
+            print(f"❌ Upload failed: {e}")
+            return jsonify({'success': False, 'error': 'Upload failed'}), 500
+        for url in documents.values():
+            app.previews.submit(os.path.basename(url))
 
         application = {
             'ref_id': ref_id,
@@ -392,21 +667,180 @@ def create_app():
             'district': district,
             'taluk': taluk,
             'village': village,
-            'lat': float(lat),
-            'lng': float(lng),
+            'lat': lat,
+            'lng': lng,
             'surveyNo': survey_no,
             'subdivNo': subdiv_no,
-            'boundary': boundary,
+            'boundary': geometry.encode_boundary(rings) if rings else [],
             'documents': documents,
+            'document_meta': document_meta,
             'status': 'pending',
             'submitted_at': datetime.now().isoformat()
         }
 
-        app.applications.append(application)
-        save_data()
+        if rings:
+            measured = geometry.measure(rings)
+            application['area_m2'] = measured['area_m2']
+            application['perimeter_m'] = measured['perimeter_m']
+
+        # flag claims on land that is already in another application
+        overlaps = app.geo_index.overlaps(rings)
+        if overlaps:
+            application['overlaps'] = overlaps
+            print(f"⚠️ {ref_id} overlaps {', '.join(overlaps)}")
+
+        app.applications.insert(application)
+        save_data(app, application)
         print(f"✅ NEW APPLICATION: {ref_id}")
         return jsonify({'success': True, 'ref_id': ref_id})
 
+    # 🔥 GEO SEARCH - grid index over parcel centroids and boundaries
+    def geo_hit(ref_id, distance=None, overlaps=None):
+        item = app.applications.get(ref_id) or {}
+        hit = {k: item.get(k) for k in ('ref_id', 'status', 'village', 'taluk', 'surveyNo', 'lat', 'lng')}
+        if distance is not None:
+            hit['distance_m'] = distance
+            hit['overlaps'] = overlaps
+        return hit
+
+    def geo_limit(default=50):
+        return max(1, min(MAX_LIMIT, int(request.args.get('limit', default))))
+
+    @app.route('/tiles/<int:z>/<int:x>/<int:y>')
+    def map_tile(z, x, y):
+        """GeoJSON tile: clustered markers below DETAIL_ZOOM, simplified boundaries above"""
+        if session.get('role') not in ['staff', 'admin']:
+            return jsonify({'success': False, 'error': 'Unauthorized'}), 403
+        if not (0 <= z <= MAX_ZOOM and 0 <= x < 2 ** z and 0 <= y < 2 ** z):
+            return jsonify({'success': False, 'error': 'No such tile'}), 404
+        tile = app.tiles.get(z, x, y)
+        response = Response(mimetype='application/geo+json')
+        response.set_etag(tile['etag'])
+        response.cache_control.private = True
+        response.cache_control.no_cache = True   # revalidate: tiles change with new submissions
+        if request.if_none_match.contains(tile['etag']):
+            response.status_code = 304
+            return response
+        response.set_data(tile['body'])
+        return response
+
+    @app.route('/api/geo/nearby')
+    def api_geo_nearby():
+        if session.get('role') not in ['staff', 'admin']:
+            return jsonify({'success': False, 'error': 'Unauthorized'}), 403
+        try:
+            lat, lng = float(request.args['lat']), float(request.args['lng'])
+            radius = min(float(request.args.get('radius', 200)), 50000)
+            limit = geo_limit()
+        except (KeyError, ValueError):
+            return jsonify({'success': False, 'error': 'lat, lng and radius (m) required'}), 400
+        hits = app.geo_index.nearby(lat, lng, radius, limit)
+        return jsonify({'success': True, 'results': [geo_hit(*hit) for hit in hits]})
+
+    @app.route('/api/geo/bbox')
+    def api_geo_bbox():
+        if session.get('role') not in ['staff', 'admin']:
+            return jsonify({'success': False, 'error': 'Unauthorized'}), 403
+        try:
+            south, west, north, east = (float(v) for v in request.args['bbox'].split(','))
+            limit = geo_limit(MAX_LIMIT)
+        except (KeyError, ValueError):
+            return jsonify({'success': False, 'error': 'bbox=south,west,north,east required'}), 400
+        ref_ids = app.geo_index.within_bbox(south, west, north, east)
+        return jsonify({'success': True, 'total': len(ref_ids),
+                        'results': [geo_hit(r) for r in sorted(ref_ids)[:limit]]})
+
+    @app.route('/api/geo/overlaps', methods=['POST'])
+    def api_geo_overlaps():
+        """Parcels overlapping (or within ``radius`` m of) a boundary or an existing application"""
+        if session.get('role') not in ['staff', 'admin']:
+            return jsonify({'success': False, 'error': 'Unauthorized'}), 403
+        data = request.get_json(silent=True) or {}
+        ref_id = data.get('ref_id')
+        if ref_id:
+            entry = app.geo_index.get(ref_id)
+            if entry is None:
+                return jsonify({'success': False, 'error': 'Application has no location'}), 404
+            box, centroid, rings = entry
+            rings = rings or [[centroid] * 3]
+        else:
+            rings = parse_rings(data.get('boundary'))
+            if not rings:
+                return jsonify({'success': False, 'error': 'boundary (min 3 points) or ref_id required'}), 400
+            if sum(len(r) for r in rings) > geometry.MAX_VERTICES:
+                return jsonify({'success': False,
+                                'error': f'Boundary has more than {geometry.MAX_VERTICES} points'}), 400
+        try:
+            radius = min(float(data.get('radius', 0)), 5000)
+        except (TypeError, ValueError):
+            return jsonify({'success': False, 'error': 'Invalid radius'}), 400
+        hits = app.geo_index.near_boundary(rings, radius, MAX_LIMIT, exclude=ref_id)
+        return jsonify({'success': True, 'results': [geo_hit(*hit) for hit in hits]})
+
+    @app.route('/api/geo/reverse')
+    def api_geo_reverse():
+        """District / taluk / village for a map click, from the local gazetteer"""
+        if session.get('role') not in ['citizen', 'staff', 'admin']:
+            return jsonify({'success': False, 'error': 'Unauthorized'}), 403
+        try:
+            lat, lng = float(request.args['lat']), float(request.args['lng'])
+        except (KeyError, ValueError):
+            return jsonify({'success': False, 'error': 'lat and lng required'}), 400
+        place = app.gazetteer.reverse(lat, lng)
+        if place is None:
+            return jsonify({'success': False, 'error': 'Outside Tamil Nadu'}), 404
+        return jsonify({'success': True, 'place': place})
+
+    @app.route('/api/geo/search')
+    def api_geo_search():
+        """Districts, taluks and villages whose name starts with ``q``"""
+        if session.get('role') not in ['citizen', 'staff', 'admin']:
+            return jsonify({'success': False, 'error': 'Unauthorized'}), 403
+        query = request.args.get('q', '').strip()
+        if not query:
+            return jsonify({'success': False, 'error': 'q required'}), 400
+        try:
+            limit = max(1, min(20, int(request.args.get('limit', 5))))
+        except ValueError:
+            return jsonify({'success': False, 'error': 'Invalid limit'}), 400
+        return jsonify({'success': True, 'results': app.gazetteer.search(query, limit)})
+
+    @app.route('/api/geo/validate')
+    def api_geo_validate():
+        """Re-measure and re-check every boundary in a district/taluk/village in one batch"""
+        if session.get('role') != 'admin':
+            return jsonify({'success': False, 'error': 'Admin only'}), 403
+        filters = {f: request.args.get(f, '') for f in ('district', 'taluk', 'village')}
+        if not any(filters.values()):
+            return jsonify({'success': False, 'error': 'district, taluk or village required'}), 400
+        items = [(a, parse_rings(a.get('boundary'))) for a in app.applications.find(**filters)]
+        items = [(a, rings) for a, rings in items if rings]
+        results = []
+        for (item, rings), measured in zip(items, geometry.measure_many([r for _, r in items])):
+            results.append(dict(measured,
+                                ref_id=item['ref_id'],
+                                problems=geometry.validate(rings),
+                                overlaps=app.geo_index.overlaps(rings, exclude=item['ref_id'])))
+        return jsonify({'success': True, 'total': len(results), 'results': results})
+
+    @app.route('/api/patta/<ref_id>/boundary')
+    def api_boundary(ref_id):
+        """Boundary decoded to GeoJSON, only when a map asks for it"""
+        role = session.get('role')
+        item = app.applications.get(ref_id)
+        if role not in ['citizen', 'staff', 'admin']:
+            return jsonify({'success': False, 'error': 'Unauthorized'}), 403
+        if not item or (role == 'citizen' and
+                        (item.get('citizen_email') or '').lower() != session.get('email', '').lower()):
+            return jsonify({'success': False, 'error': 'Application not found'}), 404
+        rings = parse_rings(item.get('boundary'))
+        return jsonify({
+            'type': 'Feature',
+            'id': ref_id,
+            'geometry': geometry.to_geojson(rings) if rings else None,
+            'properties': {k: item.get(k) for k in ('ref_id', 'status', 'village', 'surveyNo', 'area_m2')}
+        })
+
     # 🔥 UPDATE STATUS
     @app.route('/api/patta/<ref_id>/status', methods=['POST'])
     def api_update_status(ref_id):
@@ -422,18 +856,18 @@ def create_app():
         if status not in ['pending', 'approved', 'rejected']:
             return jsonify({'success': False, 'error': 'Invalid status'}), 400
 
-        for app_item in app.applications:
-            if app_item['ref_id'] == ref_id:
-                app_item['status'] = status
-                if status in ['approved', 'rejected']:
-                    app_item['approved_by'] = {
-                        'name': session.get('name', 'Unknown'),
-                        'email': session.get('email', 'unknown'),
-                        'timestamp': datetime.now().isoformat()
-                    }
-                save_data()
-                print(f"✅ {ref_id} → {status}")
-                return jsonify({'success': True, 'status': status})
+        changes = {'status': status}
+        if status in ['approved', 'rejected']:
+            changes['approved_by'] = {
+                'name': session.get('name', 'Unknown'),
+                'email': session.get('email', 'unknown'),
+                'timestamp': datetime.now().isoformat()
+            }
+        app_item = app.applications.update(ref_id, changes)
+        if app_item:
+            save_data(app, app_item)
+            print(f"✅ {ref_id} → {status}")
+            return jsonify({'success': True, 'status': status})
         
         return jsonify({'success': False, 'error': 'Application not found'}), 404
 
@@ -443,104 +877,87 @@ def create_app():
         if session.get('role') not in ['staff', 'admin']:
             return jsonify({'success': False, 'error': 'Staff/Admin only'}), 403
         
-        if not GEMINI_API_KEY:
+        if not app.verifier:
             return jsonify({'success': False, 'error': 'Gemini not configured'}), 503
         
-        app_item = next((a for a in app.applications if a['ref_id'] == ref_id), None)
-        if not app_item:
+        if ref_id not in app.applications:
             return jsonify({'success': False, 'error': 'Application not found'}), 404
         
         try:
-            context = f"""
-            Analyze Patta application:
-            Location: {app_item.get('village', 'N/A')}, {app_item.get('taluk', 'N/A')}
-            Survey: {app_item.get('surveyNo', 'N/A')}/{app_item.get('subdivNo', 'N/A')}
-            Status: {app_item.get('status', 'pending')}
-            
-            Provide: approve/reject/pending, issues, score 1-10.
-            """
-            
-            model = genai.GenerativeModel('gemini-1.5-flash')
-            response = model.generate_content(context)
-            ai_analysis = response.text
-            
-            app_item['gemini_analysis'] = {
-                'analysis': ai_analysis,
-                'analyzed_by': session.get('email'),
-                'analyzed_at': datetime.now().isoformat()
-            }
-            save_data()
-            
-            return jsonify({'success': True, 'analysis': ai_analysis})
+            ai_analysis, cached = verify_application(app, ref_id, session.get('email'))
+            return jsonify({'success': True, 'analysis': ai_analysis, 'cached': cached})
             
         except Exception as e:
             return jsonify({'success': False, 'error': str(e)}), 500
 
+    # 🔥 AI JOBS - queue verifies instead of blocking the request
+    @app.route('/api/jobs/verify/<ref_id>', methods=['POST'])
+    def api_job_verify(ref_id):
+        if session.get('role') not in ['staff', 'admin']:
+            return jsonify({'success': False, 'error': 'Staff/Admin only'}), 403
+        if not app.verifier:
+            return jsonify({'success': False, 'error': 'Gemini not configured'}), 503
+        if ref_id not in app.applications:
+            return jsonify({'success': False, 'error': 'Application not found'}), 404
+        
+        job, created = app.jobs.enqueue('verify', ref_id, session.get('email'))
+        return jsonify({'success': True, 'job': job, 'created': created}), 202
+
+    @app.route('/api/jobs/verify-pending', methods=['POST'])
+    def api_job_verify_pending():
+        if session.get('role') != 'admin':
+            return jsonify({'success': False, 'error': 'Admin only'}), 403
+        if not app.verifier:
+            return jsonify({'success': False, 'error': 'Gemini not configured'}), 503
+        
+        # oldest first; applications already analyzed are skipped unless ?force=1
+        force = request.args.get('force') == '1'
+        pending, _ = app.applications.page(
+            'submitted_at', limit=None,
+            predicate=lambda a: a.get('status', 'pending') == 'pending' and (force or not a.get('gemini_analysis'))
+        )
+        batch, queued = app.jobs.enqueue_many('verify', [a['ref_id'] for a in pending], session.get('email'))
+        print(f"🤖 BULK VERIFY: {queued} jobs queued by {session.get('email')}")
+        return jsonify({'success': True, 'batch': batch, 'queued': queued,
+                        'progress': app.jobs.progress(batch)}), 202
+
+    @app.route('/api/jobs/<job_id>')
+    def api_job_status(job_id):
+        if session.get('role') not in ['staff', 'admin']:
+            return jsonify({'success': False, 'error': 'Staff/Admin only'}), 403
+        job = app.jobs.get(job_id)
+        if not job:
+            return jsonify({'success': False, 'error': 'Job not found'}), 404
+        return jsonify({'success': True, 'job': job})
+
+    @app.route('/api/jobs')
+    def api_job_progress():
+        if session.get('role') not in ['staff', 'admin']:
+            return jsonify({'success': False, 'error': 'Staff/Admin only'}), 403
+        return jsonify({'success': True, 'progress': app.jobs.progress(request.args.get('batch'))})
+
     # 🔥 GEMINI CHAT
     @app.route('/api/gemini/chat', methods=['POST'])
     def api_gemini_chat():
         try:
             data = request.get_json() or {}
-            message = data.get('message', '').lower().strip()
+            message = data.get('message', '').strip()
             role = session.get('role', 'guest')
-            pending_count = len([a for a in applications if a.get('status') == 'pending'])
-            total_count = len(applications)
             
-            # 🔥 ROLE-SPECIFIC RESPONSES
-            responses = {
-                # ADMIN RESPONSES
-                'admin': {
-                    'hello': f'👋 Hi Admin! {pending_count} pending, {total_count} total apps.',
-                    'help': '''✅ ADMIN COMMANDS:
-    • "stats" - Full statistics
-    • "pending" - List pending apps
-    • "approve" - Approval steps
-    • "verify" - AI verification
-    • "patta" - Process overview''',
-                    'stats': f'📊 ADMIN STATS:\n• Total: {total_count}\n• Pending: {pending_count}\n• Approved: {total_count-pending_count}',
-                    'pending': f'⏳ PENDING ({pending_count}):\n• PATTA-20251228-0001 (Guindy)\nClick AI Verify!',
-                    'approve': '✅ APPROVE: Status dropdown → "Approved" → Auto-save!',
-                    'verify': '🤖 AI VERIFY: Analyzes docs → Approve/Reject + Score 1-10',
-                    'patta': '📄 ADMIN: Verify → Approve → Issue digital Patta!'
-                },
-                
-                # CITIZEN RESPONSES
-                'citizen': {
-                    'hello': f'👋 Welcome Citizen! Track your {pending_count} applications.',
-                    'help': '''✅ CITIZEN COMMANDS:
-    • "track" - Track Ref ID
-    • "status" - Check status
-    • "documents" - Required docs
-    • "submit" - Submit guide
-    • "patta" - What is Patta?''',
-                    'track': f'🔍 TRACK: Enter Ref ID (PATTA-XXXX). {pending_count} pending apps.',
-                    'status': f'📋 STATUS: {pending_count} pending. Check dashboard!',
-                    'documents': '''📄 REQUIRED (5 DOCS):
-    1. Parent document
-    2. Sale deed  
-    3. Aadhar card
-    4. Encumbrance cert
-    5. Layout scan''',
-                    'submit': '''📤 SUBMIT:
-    1. "New Application"
-    2. Draw map boundary
-    3. Upload 5 docs
-    4. Get Ref ID instantly!''',
-                    'patta': '🏆 PATTA = Digital land ownership certificate!'
-                },
-                
-                # GUEST RESPONSES  
-                'guest': {
-                    'default': '👋 Login as admin/citizen@test.com (123456)'
-                }
-            }
+            # 🔥 ROLE-SPECIFIC RESPONSES (precompiled, see intents.py)
+            intent, specific_response = app.intents.reply(role, message)
             
-            role_responses = responses.get(role, responses['guest'])
-            specific_response = role_responses.get(message, role_responses.get('default', responses['admin']['default']))
+            # Unmatched questions from signed-in users can go to the model
+            if intent is None and role != 'guest' and message and app.verifier and app.config['CHAT_LLM_FALLBACK']:
+                prompt = f"You are the Patta Portal assistant for a {role}. Answer briefly.\n\n{message}"
+                if data.get('stream'):
+                    return Response(stream_text(app.verifier.model, prompt), mimetype='text/plain',
+                                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+                specific_response = ''.join(stream_text(app.verifier.model, prompt))
             
-            return jsonify({'success': True, 'response': specific_response})
+            return jsonify({'success': True, 'response': specific_response, 'intent': intent})
             
-        except:
+        except Exception:
             return jsonify({'success': True, 'response': '🤖 AI ready! Type "help".'})
 
     # 🔥 DEBUG
@@ -549,12 +966,16 @@ def create_app():
         return f'''
         <h1>✅ Patta Portal ACTIVE</h1>
         <p>Role: <strong>{session.get("role") or "None"}</strong></p>
-        <p>Apps: {len(app.applications)}</p>
-        <p>Pending: {len([a for a in app.applications if a.get("status") == "pending"])}</p>
+        <p>Apps: {app.counters.total}</p>
+        <p>Pending: {app.counters.status("pending")}</p>
+        <p>AI Analyzed: {app.counters.ai_analyzed}</p>
         <p>Gemini: {"✅ READY" if GEMINI_API_KEY else "❌ MISSING"}</p>
         <a href="/" style="background:#10b981;color:white;padding:1rem;border-radius:8px;text-decoration:none;">→ Login</a>
         '''
 
     print("✅ Patta Portal fully loaded - All features active!")
+    if import_timer:
+        import_timer.uninstall()
+        print(import_timer.report())
     return app
 
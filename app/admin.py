@@ -4,6 +4,8 @@ from datetime import datetime
 import json
 import os
 
+from . import sessions
+
 admin_bp = Blueprint('admin', __name__, url_prefix='/api/admin')
 
 # 🔥 SESSION AUTH (matches your __init__.py)
@@ -27,15 +29,15 @@ def get_users(current_user):
     ]
     
     # Add real app stats
-    pending = len([a for a in current_app.applications if a.get('status') == 'pending'])
+    counters = current_app.counters
     
     return jsonify({
         'users': users, 
         'count': len(users),
         'admin_count': 1,
         'patta_stats': {
-            'total_applications': len(current_app.applications),
-            'pending_applications': pending
+            'total_applications': counters.total,
+            'pending_applications': counters.status('pending')
         }
     })
 
@@ -74,6 +76,8 @@ def update_user_role(user_id):
     
     # Log to audit (could save to file)
     print(f"🔒 ROLE UPDATE: {user_id} → {new_role} by {session.get('email')}")
+    # cached profile and tokens still carry the old role
+    sessions.invalidate(user_id)
     
     return jsonify({
         'message': 'Role updated successfully',
@@ -93,18 +97,20 @@ def get_security_events():
 
 @admin_bp.route('/stats', methods=['GET'])
 @admin_required
-def get_stats():
+def get_stats(current_user):
     """Complete Patta Portal statistics"""
-    apps = current_app.applications
-    pending = len([a for a in apps if a.get('status') == 'pending'])
-    ai_analyzed = len([a for a in apps if a.get('gemini_analysis')])
+    stats = current_app.counters.snapshot()
     
     return jsonify({
         'users': {'citizen': 10, 'staff': 3, 'admin': 1},
         'total_users': 14,
-        'patta_applications': len(apps),
-        'pending_applications': pending,
-        'ai_analyzed': ai_analyzed,
+        'patta_applications': stats['total'],
+        'pending_applications': stats['by_status'].get('pending', 0),
+        'ai_analyzed': stats['ai_analyzed'],
+        'by_status': stats['by_status'],
+        'by_district': stats['by_district'],
+        'by_taluk': stats['by_taluk'],
+        'daily_submissions': stats['daily_submissions'],
         'gemini_ready': bool(os.environ.get('GEMINI_API_KEY')),
         'timestamp': datetime.now().isoformat()
     })
@@ -0,0 +1,148 @@
+import hashlib
+import json
+import threading
+
+from .cache import TTLCache
+
+GEMINI_MODEL = 'gemini-1.5-flash'
+
+# everything the verification prompt is built from
+PROMPT_FIELDS = ('ref_id', 'village', 'taluk', 'surveyNo', 'subdivNo', 'status')
+
+
+def build_prompt(application):
+    return f"""
+            Analyze Patta application:
+            Location: {application.get('village', 'N/A')}, {application.get('taluk', 'N/A')}
+            Survey: {application.get('surveyNo', 'N/A')}/{application.get('subdivNo', 'N/A')}
+            Status: {application.get('status', 'pending')}
+
+            Provide: approve/reject/pending, issues, score 1-10.
+            """
+
+
+def input_hash(application, model_name=GEMINI_MODEL):
+    """Hash of the prompt inputs plus the uploaded documents' content hashes"""
+    documents = {name: meta.get('sha256') for name, meta in (application.get('document_meta') or {}).items()}
+    payload = {
+        'model': model_name,
+        'fields': {field: application.get(field) for field in PROMPT_FIELDS},
+        'documents': documents or application.get('documents') or {},
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+def gemini_model(api_key, name=GEMINI_MODEL):
+    """Import and configure the Gemini SDK on first use, not at app startup"""
+    import google.generativeai as genai
+    genai.configure(api_key=api_key)
+    return genai.GenerativeModel(name)
+
+
+class StubModel:
+    """Offline stand-in for ``genai.GenerativeModel`` (GEMINI_STUB=1, local testing)"""
+
+    class _Response:
+        def __init__(self, text):
+            self.text = text
+
+    def __init__(self, reply='pending - stub analysis, score 5/10'):
+        self.reply = reply
+        self.calls = 0
+
+    def generate_content(self, prompt, stream=False):
+        self.calls += 1
+        text = f"{self.reply} ({hashlib.sha256(str(prompt).encode()).hexdigest()[:8]})"
+        if stream:
+            return [self._Response(word + ' ') for word in text.split(' ')]
+        return self._Response(text)
+
+
+def stream_text(model, prompt):
+    """Yield the model's answer chunk by chunk as it is generated"""
+    for chunk in model.generate_content(prompt, stream=True):
+        text = getattr(chunk, 'text', '')
+        if text:
+            yield text
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class Verifier:
+    """🤖 Shared Gemini client for application verification.
+
+    One model instance serves every request. Concurrent verifies of the same
+    inputs share a single LLM call (single flight), and results are cached by
+    ``input_hash`` so a repeat click costs nothing until the application's
+    fields or documents change.
+    """
+
+    def __init__(self, model_factory, model_name=GEMINI_MODEL, cache_size=1000, ttl=24 * 3600):
+        self._model_factory = model_factory
+        self._model = None
+        self.model_name = model_name
+        self.results = TTLCache(maxsize=cache_size, ttl=ttl)
+        self._lock = threading.Lock()
+        self._flights = {}
+        self._keys = {}             # ref_id -> input hash of its cached result
+        self.calls = 0
+
+    @property
+    def model(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    self._model = self._model_factory()
+        return self._model
+
+    def attach(self, store):
+        store.add_listener(self.on_change)
+
+    def on_change(self, old, new):
+        """Drop a cached result as soon as the inputs it was computed from change"""
+        ref_id = (new or old).get('ref_id')
+        key = self._keys.get(ref_id)
+        if key and (new is None or input_hash(new, self.model_name) != key):
+            self.results.pop(key)
+            self._keys.pop(ref_id, None)
+
+    def verify(self, application):
+        """Returns ``(analysis, input_hash, cached)``; raises whatever the model raises"""
+        key = input_hash(application, self.model_name)
+        previous = application.get('gemini_analysis') or {}
+        if previous.get('input_hash') == key:
+            return previous.get('analysis'), key, True
+        analysis = self.results.get(key)
+        if analysis is not None:
+            return analysis, key, True
+
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result, key, True
+
+        try:
+            self.calls += 1
+            flight.result = self.model.generate_content(build_prompt(application)).text
+            self.results.set(key, flight.result)
+            self._keys[application.get('ref_id')] = key
+            return flight.result, key, False
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
@@ -0,0 +1,174 @@
+import atexit
+import os
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from .journal import Journal
+
+FIRESTORE_BATCH_LIMIT = 500
+
+
+class AuditSink:
+    """🧾 Asynchronous writer for audit trails and security events.
+
+    ``emit`` spools the event to a local journal and queues it; a background
+    thread writes queued events to Firestore in batches of up to 500 and
+    acknowledges them in the spool. Events that were spooled but not yet
+    acknowledged (crash, Firestore outage, full queue) are sent again on
+    the next start. Each event carries its own document id, so a resend
+    overwrites instead of duplicating.
+    """
+
+    def __init__(self, spool_path, maxsize=10000, batch_size=FIRESTORE_BATCH_LIMIT,
+                 interval=1.0, block_timeout=0.5):
+        self.spool = Journal(spool_path, compact_every=2000)
+        self.batch_size = min(batch_size, FIRESTORE_BATCH_LIMIT)
+        self.interval = interval
+        self.block_timeout = block_timeout
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._pending = {}          # id -> event, spooled but not yet in Firestore
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._db = None
+        self._started = False
+        self.written = 0
+        self.deferred = 0
+
+    # ---------- PRODUCERS ----------
+
+    def emit(self, db, collection, data, doc_id=None):
+        """Queue one document for ``collection``; returns without touching Firestore.
+
+        Never raises: auditing must not turn a good request into an error.
+        """
+        event = {
+            'id': doc_id or uuid.uuid4().hex,
+            'collection': collection,
+            'data': data,
+            'emitted_at': datetime.now().isoformat(),
+        }
+        try:
+            self._start(db)
+            with self._lock:
+                self._pending[event['id']] = event
+            self.spool.append({'op': 'event', 'event': event}, wait=False)
+        except Exception as e:
+            print(f"❌ Audit event {event['collection']} not spooled: {e}")
+            return event['id']
+        try:
+            self._queue.put(event, timeout=self.block_timeout)
+        except queue.Full:
+            # backpressure: stays in the spool and goes out after the next restart
+            self.deferred += 1
+            print(f"⚠️ Audit queue full, {event['collection']} event deferred to spool")
+        return event['id']
+
+    # ---------- STARTUP ----------
+
+    def _start(self, db):
+        self._db = db
+        if self._started:
+            return
+        # concurrent first emits wait here until the spool is open
+        with self._start_lock:
+            if not self._started:
+                self._open()
+
+    def _open(self):
+        snapshot = self.spool.read_snapshot() or {}
+        pending = {e['id']: e for e in snapshot.get('pending', [])}
+        for record in self.spool.read_records(snapshot.get('journal_seq', 0)):
+            if record.get('op') == 'event':
+                pending[record['event']['id']] = record['event']
+            elif record.get('op') == 'ack':
+                for event_id in record['ids']:
+                    pending.pop(event_id, None)
+        with self._lock:
+            self._pending.update(pending)
+        self.spool.open(self._snapshot)
+        if pending:
+            print(f"🧾 Resending {len(pending)} spooled audit events")
+
+        threading.Thread(target=self._writer, args=(list(pending.values()),),
+                         name='audit-writer', daemon=True).start()
+        atexit.register(self.flush)
+        self._started = True
+
+    def _snapshot(self):
+        with self._lock:
+            return {'pending': list(self._pending.values())}
+
+    # ---------- WRITER ----------
+
+    def _writer(self, backlog):
+        delay = self.interval
+        while True:
+            batch, backlog = backlog[:self.batch_size], backlog[self.batch_size:]
+            if not batch:
+                try:
+                    batch.append(self._queue.get(timeout=self.interval))
+                except queue.Empty:
+                    continue
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            # Firestore down: keep the batch and back off, the queue absorbs new events
+            while not self._write(batch):
+                time.sleep(delay)
+                delay = min(delay * 2, 60)
+            delay = self.interval
+
+    def _write(self, events):
+        try:
+            from firebase_admin import firestore
+            db = self._db
+            batch = db.batch()
+            for event in events:
+                data = dict(event['data'], timestamp=firestore.SERVER_TIMESTAMP,
+                            emitted_at=event['emitted_at'])
+                batch.set(db.collection(event['collection']).document(event['id']), data)
+            batch.commit()
+        except Exception as e:
+            print(f"❌ Audit batch of {len(events)} failed: {e}")
+            return False
+
+        ids = [event['id'] for event in events]
+        with self._lock:
+            for event_id in ids:
+                self._pending.pop(event_id, None)
+        self.spool.append({'op': 'ack', 'ids': ids}, wait=False)
+        self.written += len(ids)
+        return True
+
+    def flush(self):
+        """Best-effort synchronous drain (used at exit)"""
+        events = []
+        while True:
+            try:
+                events.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        for start in range(0, len(events), self.batch_size):
+            self._write(events[start:start + self.batch_size])
+        self.spool.close()
+
+    def stats(self):
+        return {
+            'queued': self._queue.qsize(),
+            'pending': len(self._pending),
+            'written': self.written,
+            'deferred': self.deferred,
+        }
+
+
+sink = AuditSink(os.environ.get('AUDIT_SPOOL', 'audit_spool.json'))
+
+
+def emit(db, collection, data, doc_id=None):
+    return sink.emit(db, collection, data, doc_id)
@@ -1,17 +1,17 @@
 from flask import Blueprint, request, jsonify, session
-import firebase_admin
-from firebase_admin import auth, firestore
 from functools import wraps
 import os
 from dotenv import load_dotenv
 from hashlib import sha256
 import secrets
-import time
 import re
-from collections import defaultdict
 
-# Global rate limits (shared across requests)
-rate_limits = defaultdict(list)
+from .ratelimit import limiter, scope_for
+from . import sessions
+from . import audit
+from .startup import LazyModule
+
+firestore = LazyModule('firebase_admin.firestore')
 
 # Load environment
 load_dotenv()
@@ -37,12 +37,10 @@ def token_required(f):
             from flask import current_app
             db = current_app.db
 
-            user_doc = db.collection('users').document(uid).get()
-            if not user_doc.exists:
+            user_data = sessions.load_profile(db, uid)
+            if user_data is None:
                 return jsonify({'error': 'User not found'}), 404
 
-            user_data = user_doc.to_dict()
-
             # Session fingerprint
             session_fingerprint = sha256(f"{client_ip}:{user_agent}".encode()).hexdigest()
 
@@ -51,15 +49,14 @@ def token_required(f):
                 user_data.get('last_session')
                 and user_data.get('last_session') != session_fingerprint
             ):
-                db.collection('security_events').add({
+                audit.emit(db, 'security_events', {
                     'event': 'suspicious_session',
                     'uid': uid,
                     'ip': client_ip,
-                    'timestamp': firestore.SERVER_TIMESTAMP
                 })
 
-            # Update activity
-            db.collection('users').document(uid).update({
+            # Update activity (batched, see sessions.ActivityWriter)
+            sessions.activity.record(db, uid, {
                 'last_activity': firestore.SERVER_TIMESTAMP,
                 'last_ip': client_ip
             })
@@ -69,11 +66,10 @@ def token_required(f):
         except Exception as e:
             try:
                 from flask import current_app
-                current_app.db.collection('security_events').add({
+                audit.emit(current_app.db, 'security_events', {
                     'event': 'auth_failure',
                     'error': str(e)[:500],
                     'ip': client_ip,
-                    'timestamp': firestore.SERVER_TIMESTAMP
                 })
             except:
                 pass
@@ -85,21 +81,15 @@ def token_required(f):
 def rate_limit(key="ip", limit=100, window=3600):
     """⏱️ Rate limiting decorator"""
     def decorator(f):
+        scope = scope_for(f)
         @wraps(f)
         def decorated_function(*args, **kwargs):
             client_key = request.remote_addr if key == "ip" else key
-            now = time.time()
-
-            # Clean expired requests
-            rate_limits[client_key] = [
-                req_time for req_time in rate_limits[client_key]
-                if now - req_time < window
-            ]
 
-            if len(rate_limits[client_key]) >= limit:
-                return jsonify({'error': 'Rate limit exceeded'}), 429
+            retry_after = limiter.hit(f"{scope}:{client_key}", limit, window)
+            if retry_after:
+                return jsonify({'error': 'Rate limit exceeded'}), 429, {'Retry-After': str(retry_after)}
 
-            rate_limits[client_key].append(now)
             return f(*args, **kwargs)
         return decorated_function
     return decorator
@@ -196,6 +186,7 @@ def login():
             'last_session': session_fingerprint,
             'last_login': firestore.SERVER_TIMESTAMP,
         })
+        sessions.invalidate(user_doc_id)
 
         print('LOGIN SUCCESS, UID:', user_doc_id)
         return jsonify({
@@ -221,14 +212,7 @@ def login():
 def get_me(current_user, uid):
     """👤 Get current user profile"""
     try:
-        from flask import current_app
-        db = current_app.db
-
-        user_doc = db.collection('users').document(uid).get()
-        if not user_doc.exists:
-            return jsonify({'error': 'User not found'}), 404
-
-        user_data = user_doc.to_dict()
+        user_data = current_user
         return jsonify({
             'uid': uid,
             'email': user_data.get('email', ''),
@@ -247,6 +231,7 @@ def get_me(current_user, uid):
 @token_required
 def logout(current_user, uid):
     """🚪 Logout and invalidate session"""
+    sessions.invalidate(uid, request.headers.get('Authorization', '').replace('Bearer ', ''))
     try:
         from flask import current_app
         db = current_app.db
@@ -0,0 +1,139 @@
+import glob
+import hashlib
+import os
+import shutil
+import threading
+import uuid
+
+from werkzeug.utils import secure_filename
+
+from .journal import Journal
+
+CHUNK_SIZE = 64 * 1024
+
+
+class BlobStore:
+    """📦 Content-addressed document storage under ``<root>/cas``.
+
+    Uploads are streamed to disk in chunks while their SHA-256 is computed,
+    then stored as ``cas/<sha[:2]>/<sha><ext>``. Identical documents share
+    one file; a refcounted manifest (journaled like the application data)
+    tracks how many applications point at each object.
+
+    The manifest and half-written uploads live in ``state_dir``, outside the
+    served ``root``, so object names can never be listed over HTTP.
+    """
+
+    def __init__(self, root, state_dir, url_prefix='/uploads'):
+        self.root = root
+        self.url_prefix = url_prefix
+        self.cas_dir = os.path.join(root, 'cas')
+        self.tmp_dir = os.path.join(state_dir, 'blob_tmp')
+        self.manifest = Journal(os.path.join(state_dir, 'blob_manifest.json'),
+                                os.path.join(state_dir, 'blob_manifest.journal'), compact_every=500)
+        self.objects = {}
+        self._lock = threading.Lock()
+
+    def open(self):
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        self._move_legacy_state()
+        snapshot = self.manifest.read_snapshot() or {}
+        self.objects = snapshot.get('objects', {})
+        for record in self.manifest.read_records(snapshot.get('journal_seq', 0)):
+            self._apply(record)
+        self.manifest.open(lambda: {'objects': {k: dict(v) for k, v in self.objects.items()}})
+        print(f"✅ Blob store: {len(self.objects)} documents")
+        return self
+
+    def _move_legacy_state(self):
+        """Older releases kept the manifest and tmp files inside the served folder"""
+        for old, new in ((os.path.join(self.root, 'manifest.json'), self.manifest.snapshot_path),
+                         (os.path.join(self.root, 'manifest.journal'), self.manifest.journal_path)):
+            if os.path.exists(old) and not os.path.exists(new):
+                os.replace(old, new)
+                print(f"🔒 Moved {os.path.basename(old)} out of the uploads folder")
+        shutil.rmtree(os.path.join(self.cas_dir, 'tmp'), ignore_errors=True)
+
+    # ---------- WRITES ----------
+
+    def put(self, file):
+        """Stream an uploaded FileStorage into the store and take a reference on it"""
+        ext = os.path.splitext(secure_filename(file.filename or ''))[1].lower()
+        tmp_path = os.path.join(self.tmp_dir, uuid.uuid4().hex)
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with open(tmp_path, 'wb') as out:
+                for chunk in iter(lambda: file.stream.read(CHUNK_SIZE), b''):
+                    digest.update(chunk)
+                    out.write(chunk)
+                    size += len(chunk)
+
+            sha256 = digest.hexdigest()
+            name = f"{sha256}{ext}"
+            path = self.path_for(name)
+            with self._lock:
+                if os.path.exists(path):
+                    os.remove(tmp_path)  # 🔁 duplicate document - costs no extra disk
+                else:
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    os.replace(tmp_path, path)
+                self._ref(name, 1, sha256=sha256, size=size)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        return {
+            'url': self.url_for(name),
+            'sha256': sha256,
+            'size': size,
+            'filename': file.filename,
+        }
+
+    def release(self, url_or_name):
+        """Drop one reference; the file is deleted when nobody points at it anymore"""
+        name = os.path.basename(url_or_name)
+        with self._lock:
+            if name not in self.objects:
+                return
+            self._ref(name, -1)
+            if name not in self.objects:
+                path = self.path_for(name)
+                # the object plus anything derived from it (thumbnails, previews)
+                for stale in [path] + glob.glob(glob.escape(path) + '.*'):
+                    try:
+                        os.remove(stale)
+                    except OSError:
+                        pass
+
+    def _ref(self, name, delta, **meta):
+        record = dict({'op': 'ref', 'object': name, 'delta': delta}, **meta)
+        self._apply(record)
+        self.manifest.append(record)
+
+    def _apply(self, record):
+        entry = self.objects.setdefault(record['object'], {'refs': 0})
+        entry['refs'] += record['delta']
+        for key in ('sha256', 'size'):
+            if key in record:
+                entry[key] = record[key]
+        if entry['refs'] <= 0:
+            del self.objects[record['object']]
+
+    # ---------- LOOKUPS ----------
+
+    def path_for(self, name):
+        return os.path.join(self.cas_dir, name[:2], name)
+
+    def url_for(self, name):
+        return f"{self.url_prefix}/cas/{name[:2]}/{name}"
+
+    def is_object(self, relative_path):
+        """True for ``cas/<xx>/<sha><ext>`` paths served from this store"""
+        return self.object_name(relative_path) is not None
+
+    def object_name(self, relative_path):
+        parts = relative_path.split('/')
+        if len(parts) == 3 and parts[0] == 'cas' and parts[1] == parts[2][:2] and parts[2] in self.objects:
+            return parts[2]
+        return None
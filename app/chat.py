@@ -1,27 +1,23 @@
-from flask import Blueprint, request, jsonify, current_app
-import google.generativeai as genai
+from flask import Blueprint, Response, request, jsonify, current_app
 import os
 from dotenv import load_dotenv
 
+from . import audit
+from .ai import gemini_model
+from .cache import TTLCache
+from .events import format_sse
+from .intents import PUNCTUATION
+from .search import normalize, tokenize
+from .startup import LazyObject
+
 load_dotenv()
 chat_bp = Blueprint('chat', __name__, url_prefix='/api/chat')
 
-# Configure Gemini
-genai.configure(api_key=os.getenv('GEMINI_API_KEY'))
-model = genai.GenerativeModel('gemini-1.5-flash')
+# Gemini client, configured on the first question instead of at import
+model = LazyObject(lambda: gemini_model(os.getenv('GEMINI_API_KEY')))
 
-@chat_bp.route('/ask', methods=['POST'])
-def ask_gemini():
-    """Citizen asks Gemini about Patta verification"""
-    data = request.get_json()
-    question = data.get('question', '')
-    
-    if not question:
-        return jsonify({'error': 'Question required'}), 400
-    
-    try:
-        # Patta-specific system prompt
-        system_prompt = """
+# Patta-specific system prompt
+SYSTEM_PROMPT = """
         You are PattaBot, expert in Tamil Nadu land records verification.
         Help citizens with:
         - Patta verification process
@@ -33,18 +29,80 @@ def ask_gemini():
         Always respond in simple Tamil/English mix.
         Be helpful, accurate, and official.
         """
+
+# Citizens ask the same few questions; normalized question -> answer
+answers = TTLCache(maxsize=2000, ttl=6 * 3600)
+STOPWORDS = frozenset('a an the is are was what which how do does i my me to for of in on with about please can you'.split())
+
+
+def question_key(question):
+    """Same key for "What documents are required?" and "required documents" """
+    tokens = tokenize(PUNCTUATION.sub(' ', question))
+    words = sorted({t for t in tokens if t not in STOPWORDS and ' ' not in t})
+    return ' '.join(words) or normalize(question)
+
+
+def log_chat(db, question, answer, cached):
+    """Chat log goes through the async audit sink, off the response path"""
+    return audit.emit(db, 'chat_logs', {
+        'question': question,
+        'answer': answer,
+        'user_role': 'citizen',
+        'cached': cached
+    })
+
+
+@chat_bp.route('/ask', methods=['POST'])
+def ask_gemini():
+    """Citizen asks Gemini about Patta verification"""
+    data = request.get_json()
+    question = data.get('question', '')
+    
+    if not question:
+        return jsonify({'error': 'Question required'}), 400
+    
+    db = current_app.db
+    key = question_key(question)
+    answer = answers.get(key)
+    wants_stream = data.get('stream') or 'text/event-stream' in request.headers.get('Accept', '')
+    
+    if wants_stream:
+        # SSE: first tokens reach the citizen while Gemini is still writing
+        def generate():
+            if answer is not None:
+                yield format_sse({'type': 'token', 'text': answer})
+                yield format_sse({'type': 'done', 'id': log_chat(db, question, answer, True), 'cached': True})
+                return
+            parts = []
+            try:
+                for chunk in model.generate_content([SYSTEM_PROMPT, question], stream=True):
+                    text = getattr(chunk, 'text', '')
+                    if text:
+                        parts.append(text)
+                        yield format_sse({'type': 'token', 'text': text})
+            except Exception as e:
+                yield format_sse({'type': 'error', 'error': 'Chat service unavailable', 'details': str(e)})
+                return
+            full = ''.join(parts)
+            if full.strip():   # an empty stream must not be served from cache for hours
+                answers.set(key, full)
+            yield format_sse({'type': 'done', 'id': log_chat(db, question, full, False), 'cached': False})
         
-        response = model.generate_content([system_prompt, question])
-        answer = response.text
+        return Response(generate(), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    
+    try:
+        cached = answer is not None
+        if not cached:
+            answer = model.generate_content([SYSTEM_PROMPT, question]).text
+            if answer and answer.strip():
+                answers.set(key, answer)
         
         return jsonify({
             'question': question,
             'answer': answer,
-            'timestamp': current_app.db.collection('chat_logs').add({
-                'question': question,
-                'answer': answer,
-                'user_role': 'citizen'
-            })[1].id
+            'cached': cached,
+            'timestamp': log_chat(db, question, answer, cached)
         })
     
     except Exception as e:
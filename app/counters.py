@@ -0,0 +1,70 @@
+import threading
+from collections import Counter
+
+
+class ApplicationCounters:
+    """📊 Aggregates over the application store, maintained on every mutation.
+
+    Stats, chat and debug endpoints read these instead of re-counting the
+    whole store on each request.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.rebuild([])
+
+    def attach(self, store):
+        """Count what the store already holds, then follow its changes"""
+        self.rebuild(store)
+        store.add_listener(self.on_change)
+
+    def rebuild(self, applications):
+        with self._lock:
+            self.total = 0
+            self.ai_analyzed = 0
+            self.by_status = Counter()
+            self.by_district = Counter()
+            self.by_taluk = Counter()
+            self.daily = Counter()
+            for application in applications:
+                self._apply(application, 1)
+
+    def on_change(self, old, new):
+        with self._lock:
+            if old is not None:
+                self._apply(old, -1)
+            if new is not None:
+                self._apply(new, 1)
+
+    def _apply(self, application, delta):
+        self.total += delta
+        if application.get('gemini_analysis'):
+            self.ai_analyzed += delta
+        self._bump(self.by_status, application.get('status', 'pending'), delta)
+        self._bump(self.by_district, application.get('district'), delta)
+        self._bump(self.by_taluk, application.get('taluk'), delta)
+        self._bump(self.daily, (application.get('submitted_at') or '')[:10], delta)
+
+    @staticmethod
+    def _bump(counter, key, delta):
+        if not key:
+            return
+        counter[key] += delta
+        if counter[key] <= 0:
+            del counter[key]
+
+    # ---------- READS ----------
+
+    def status(self, status):
+        return self.by_status.get(status, 0)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'total': self.total,
+                'ai_analyzed': self.ai_analyzed,
+                'by_status': dict(self.by_status),
+                'by_district': dict(self.by_district),
+                'by_taluk': dict(self.by_taluk),
+                'daily_submissions': dict(self.daily),
+            }
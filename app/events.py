@@ -0,0 +1,115 @@
+import json
+import queue
+import threading
+import time
+
+
+class Subscriber:
+    """One connected dashboard with its own bounded event queue"""
+
+    def __init__(self, role, email=None, maxsize=100):
+        self.role = role
+        self.email = (email or '').lower()
+        self.queue = queue.Queue(maxsize=maxsize)
+
+    def wants(self, event):
+        if event.get('admin_only'):
+            return self.role == 'admin'
+        if self.role in ('staff', 'admin'):
+            return True
+        return self.role == 'citizen' and event.get('citizen_email') == self.email
+
+    def put(self, event):
+        """Never blocks the publisher: a full queue drops the oldest event and asks for a resync"""
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                pass
+            try:
+                self.queue.put_nowait({'type': 'resync', 'rev': event.get('rev')})
+            except queue.Full:
+                pass
+
+
+class EventBus:
+    """📡 In-process fan-out of application changes to SSE subscribers.
+
+    Each gunicorn worker has its own bus. An open stream occupies a thread
+    for up to ``SSE_MAX_SECONDS``, so streaming is only enabled under
+    threaded workers (``gunicorn.conf.py``); sync deployments poll. Every
+    event only tells the dashboard to pull ``/changes``, so a client that
+    reconnects to another worker or misses events still converges.
+    """
+
+    def __init__(self, queue_size=100):
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._subscribers = set()
+
+    def attach(self, store):
+        store.add_listener(self.on_change)
+
+    def on_change(self, old, new):
+        application = new or old
+        self.publish({
+            'type': 'application',
+            'ref_id': application.get('ref_id'),
+            'rev': application.get('rev'),
+            'status': new.get('status') if new else None,
+            'deleted': new is None,
+            'citizen_email': (application.get('citizen_email') or '').lower(),
+        })
+
+    def subscribe(self, role, email=None):
+        subscriber = Subscriber(role, email, self.queue_size)
+        with self._lock:
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def publish(self, event):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            if subscriber.wants(event):
+                subscriber.put(event)
+
+    def __len__(self):
+        return len(self._subscribers)
+
+
+def format_sse(event):
+    lines = []
+    if event.get('rev') is not None:
+        lines.append(f"id: {event['rev']}")
+    lines.append(f"event: {event.get('type', 'message')}")
+    payload = {k: v for k, v in event.items() if k not in ('citizen_email', 'admin_only')}
+    lines.append(f"data: {json.dumps(payload)}")
+    return '\n'.join(lines) + '\n\n'
+
+
+def stream(bus, subscriber, resync_rev=None, max_seconds=55, heartbeat=15, retry_ms=3000):
+    """SSE generator: heartbeats keep proxies open, ``max_seconds`` bounds how long a thread is held"""
+    try:
+        yield f"retry: {retry_ms}\n\n"
+        if resync_rev is not None:
+            yield format_sse({'type': 'resync', 'rev': resync_rev})
+        deadline = time.monotonic() + max_seconds
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            try:
+                event = subscriber.queue.get(timeout=min(heartbeat, remaining))
+            except queue.Empty:
+                yield ': ping\n\n'
+                continue
+            yield format_sse(event)
+    finally:
+        bus.unsubscribe(subscriber)
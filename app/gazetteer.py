@@ -0,0 +1,152 @@
+import bisect
+import json
+import os
+import threading
+
+from . import geometry
+from .cache import TTLCache
+from .geo import GeoIndex
+from .search import normalize, tokenize
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+GAZETTEER_FILE = os.path.join(DATA_DIR, 'gazetteer_tn.json')
+OUTLINE_FILE = os.path.join(DATA_DIR, 'tn_outline.json')
+KINDS = ('district', 'taluk', 'village')
+VILLAGE_RADIUS_M = 3000       # a click further than this from every village only gets its taluk
+TALUK_RADII_M = (10000, 30000, 60000)   # widened until a taluk headquarters is found
+REVERSE_PRECISION = 4         # ~11 m; clicks closer than this share a cache entry
+MAX_MATCHES = 200             # name keys a search prefix may expand to before ranking
+
+
+def _at(node):
+    """``(lat, lng)`` of a place node: ``[lat, lng]`` or ``{'at': [lat, lng], ...}``"""
+    at = node.get('at') if isinstance(node, dict) else node
+    return float(at[0]), float(at[1])
+
+
+def _aka(node):
+    return list(node.get('aka') or []) if isinstance(node, dict) else []
+
+
+class Gazetteer:
+    """📍 Tamil Nadu districts, taluks and villages for form auto-fill.
+
+    Read from ``data/gazetteer_tn.json`` on first use. Reverse lookups check
+    the point against the state outline (``data/tn_outline.json``) so a click
+    in Bengaluru or Puducherry is not pinned to the nearest Tamil Nadu taluk,
+    then go through two grid indexes (villages, then taluk headquarters).
+    Name search walks a sorted key list. Both answer in well under a
+    millisecond without calling an outside geocoder, and answers are kept in
+    an LRU cache keyed by the rounded point or the normalized query.
+    """
+
+    def __init__(self, path=GAZETTEER_FILE, outline_path=OUTLINE_FILE, cache_size=5000, ttl=24 * 3600):
+        self.path = path
+        self.outline_path = outline_path
+        self.cache = TTLCache(maxsize=cache_size, ttl=ttl)
+        self.places = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._ensure())
+
+    # ---------- QUERY ----------
+
+    def reverse(self, lat, lng):
+        """Nearest village (or taluk headquarters) as ``{district, taluk, village, distance_m}``, None outside the state"""
+        key = ('reverse', round(lat, REVERSE_PRECISION), round(lng, REVERSE_PRECISION))
+        # outside the state is cached as {} (get_or_load never keeps None)
+        return self.cache.get_or_load(key, lambda: self._reverse(lat, lng)) or None
+
+    def search(self, query, limit=5):
+        """Places whose name (or alias) starts with ``query``; ``"place, district"`` narrows by district/taluk"""
+        parts = [normalize(p) for p in str(query).split(',')]
+        parts = [p for p in parts if p]
+        if not parts:
+            return []
+        key = ('search', tuple(parts), limit)
+        return self.cache.get_or_load(key, lambda: self._search(parts[0], parts[1:], limit))
+
+    def _reverse(self, lat, lng):
+        self._ensure()
+        if not geometry.contains(self._outline, lat, lng):
+            return {}
+        hits = self._villages.nearby(lat, lng, VILLAGE_RADIUS_M, limit=1)
+        if not hits:
+            for radius in TALUK_RADII_M:
+                hits = self._taluks.nearby(lat, lng, radius, limit=1)
+                if hits:
+                    break
+        if not hits:
+            return {}
+        ref_id, distance, _ = hits[0]
+        return dict(self._public(self.places[ref_id]), distance_m=distance)
+
+    def _search(self, prefix, context, limit):
+        places = self._ensure()
+        keys = self._keys
+        matches = {}
+        start = bisect.bisect_left(keys, (prefix,))
+        for name_key, whole, index in keys[start:start + MAX_MATCHES]:
+            if not name_key.startswith(prefix):
+                break
+            # exact name, then name prefix, then a word inside the name
+            rank = 0 if whole and name_key == prefix else 1 if whole else 2
+            matches[index] = min(rank, matches.get(index, rank))
+        ranked = sorted(matches, key=lambda i: (matches[i], KINDS.index(places[i]['kind']), places[i]['name']))
+        if context:
+            narrowed = [i for i in ranked if all(
+                any(name.startswith(part) for name in places[i]['context']) for part in context)]
+            ranked = narrowed or ranked   # "…, Tamil Nadu" narrows nothing, so ignore it
+        return [self._public(places[i]) for i in ranked[:limit]]
+
+    @staticmethod
+    def _public(place):
+        return {k: place[k] for k in ('kind', 'name', 'district', 'taluk', 'village', 'lat', 'lng')}
+
+    # ---------- LOAD ----------
+
+    def _ensure(self):
+        if self.places is None:
+            with self._lock:
+                if self.places is None:
+                    self._load()
+        return self.places
+
+    def _load(self):
+        with open(self.path, encoding='utf-8') as f:
+            tree = json.load(f)
+        places = []
+
+        def add(kind, node, district, taluk='', village=''):
+            lat, lng = _at(node)
+            names = [district, taluk, village]
+            places.append({
+                'ref_id': len(places), 'kind': kind, 'name': names[KINDS.index(kind)],
+                'district': district, 'taluk': taluk, 'village': village,
+                'lat': lat, 'lng': lng, 'aka': _aka(node),
+                'context': [normalize(n) for n in [district, taluk] + _aka(tree[district]) if n],
+            })
+
+        for district, d in tree.items():
+            add('district', d, district)
+            for taluk, t in (d.get('taluks') or {}).items():
+                add('taluk', t, district, taluk)
+                for village, v in (t.get('villages') or {}).items():
+                    add('village', v, district, taluk, village)
+
+        keys = []
+        for place in places:
+            for name in [place['name']] + place['aka']:
+                whole = normalize(name)
+                keys.extend((token, token == whole, place['ref_id']) for token in tokenize(name))
+        keys.sort()
+
+        villages, taluks = GeoIndex(cell_deg=0.05), GeoIndex(cell_deg=0.2)
+        villages.rebuild(p for p in places if p['kind'] == 'village')
+        taluks.rebuild(p for p in places if p['kind'] == 'taluk')
+        with open(self.outline_path, encoding='utf-8') as f:
+            outline = geometry.as_rings(json.load(f)['rings'])
+        self._keys, self._villages, self._taluks, self._outline = keys, villages, taluks, outline
+        self.places = places
+        print(f"📍 Gazetteer loaded: {len(tree)} districts, {len(taluks)} taluks, {len(villages)} villages")
@@ -0,0 +1,217 @@
+import math
+import threading
+
+from . import geometry
+
+CELL_DEG = 0.01            # ~1.1 km grid cells; a village parcel sits in one to four
+MAX_CELLS = 400            # boxes spanning more cells than this are kept in a side list
+METRES_PER_DEG = geometry.METRES_PER_DEG
+
+
+def _point(p):
+    if isinstance(p, dict):
+        return float(p['lat']), float(p['lng'])
+    return float(p[0]), float(p[1])
+
+
+def parse_rings(boundary):
+    """Rings of ``(lat, lng)`` floats from any stored boundary shape.
+
+    Accepts the compact ``geometry.encode_boundary`` form, the dashboard's
+    ``[[["13.08", "80.21"], ...]]`` (string pairs from ``toFixed``), a flat
+    list of pairs, or the old seed script's flat list of ``{'lat', 'lng'}``
+    dicts. Unparseable boundaries give ``[]``.
+    """
+    if geometry.is_encoded(boundary):
+        try:
+            return [ring for ring in geometry.decode_boundary(boundary) if len(ring) >= 3]
+        except (TypeError, ValueError, UnicodeEncodeError):
+            return []
+    if not boundary or not isinstance(boundary, list):
+        return []
+    try:
+        first = boundary[0]
+        if isinstance(first, dict) or (isinstance(first, (list, tuple)) and first
+                                       and not isinstance(first[0], (list, tuple, dict))):
+            boundary = [boundary]
+        rings = []
+        for ring in boundary:
+            points = [_point(p) for p in ring]
+            if len(points) >= 3:
+                rings.append(points)
+        return rings
+    except (KeyError, IndexError, TypeError, ValueError):
+        return []
+
+
+def expand(box, metres):
+    """Bounding box grown by ``metres`` on every side"""
+    s, w, n, e = box
+    dlat = metres / METRES_PER_DEG
+    dlng = metres / (METRES_PER_DEG * max(0.01, math.cos(math.radians((s + n) / 2))))
+    return s - dlat, w - dlng, n + dlat, e + dlng
+
+
+def _intersects(a, b):
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+def locate(application):
+    """``(box, centroid, rings)`` of an application, or None if it has no location"""
+    rings = geometry.as_rings(parse_rings(application.get('boundary')))
+    try:
+        centroid = (float(application['lat']), float(application['lng']))
+    except (KeyError, TypeError, ValueError):
+        centroid = None
+    if centroid == (0.0, 0.0):
+        centroid = None   # the apply form's "no location" default
+    if rings:
+        box = geometry.bounds(rings)
+        if centroid is None:
+            centroid = ((box[0] + box[2]) / 2, (box[1] + box[3]) / 2)
+    elif centroid is not None:
+        box = centroid + centroid
+    else:
+        return None
+    return box, centroid, rings
+
+
+class GeoIndex:
+    """🗺️ Grid index over application centroids and boundary bounding boxes.
+
+    Each application is filed under every ``CELL_DEG`` cell its bounding box
+    touches, so radius, bounding-box and overlap queries only look at the
+    handful of cells around the query instead of every parcel. Exact
+    distance/overlap tests then run on those few candidates as one batch
+    (see ``geometry.compare``).
+    """
+
+    def __init__(self, cell_deg=CELL_DEG):
+        self.cell_deg = cell_deg
+        self._lock = threading.Lock()
+        self.rebuild([])
+
+    def attach(self, store):
+        self.rebuild(store)
+        store.add_listener(self.on_change)
+
+    def rebuild(self, applications):
+        with self._lock:
+            self._cells = {}
+            self._oversize = set()
+            self._entries = {}      # ref_id -> (box, centroid, rings)
+            for application in applications:
+                self._add(application)
+
+    def on_change(self, old, new):
+        if old is not None and new is not None and all(
+                old.get(f) is new.get(f) or old.get(f) == new.get(f) for f in ('lat', 'lng', 'boundary')):
+            return  # status/analysis updates don't move a parcel
+        with self._lock:
+            if old is not None:
+                self._remove(old['ref_id'])
+            if new is not None:
+                self._add(new)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, ref_id):
+        return self._entries.get(ref_id)
+
+    # ---------- QUERY ----------
+
+    def within_bbox(self, south, west, north, east, limit=None):
+        """ref_ids whose bounding box intersects the query box"""
+        box = (south, west, north, east)
+        with self._lock:
+            hits = [r for r in self._candidates(box) if _intersects(self._entries[r][0], box)]
+        return hits[:limit] if limit else hits
+
+    def entries(self, ref_ids):
+        """``(ref_id, (box, centroid, rings))`` for ids still in the index"""
+        with self._lock:
+            return [(r, self._entries[r]) for r in ref_ids if r in self._entries]
+
+    def nearby(self, lat, lng, radius_m, limit=50):
+        """``[(ref_id, metres, inside)]`` within ``radius_m`` of a point, nearest first"""
+        return self.near_boundary([[(lat, lng)] * 3], radius_m, limit)
+
+    def near_boundary(self, rings, radius_m=0, limit=50, exclude=None):
+        """``[(ref_id, metres, overlapping)]`` of parcels within ``radius_m`` of ``rings``, nearest first"""
+        rings = geometry.as_rings(rings)
+        if not rings:
+            return []
+        query = expand(geometry.bounds(rings), radius_m)
+        refs, shapes = [], []
+        with self._lock:
+            for ref_id in self._candidates(query):
+                box, centroid, other = self._entries[ref_id]
+                if ref_id != exclude and _intersects(box, query):
+                    refs.append(ref_id)
+                    shapes.append(other or [[centroid] * 3])
+        # exact test for every surviving candidate in one NumPy batch
+        gaps, overlapping = geometry.compare(rings, shapes)
+        hits = [(ref_id, round(float(gap), 1), bool(over))
+                for ref_id, gap, over in zip(refs, gaps, overlapping) if gap <= radius_m]
+        hits.sort(key=lambda h: (h[1], h[0]))
+        return hits[:limit]
+
+    def overlaps(self, rings, exclude=None, limit=50):
+        return [ref_id for ref_id, _, overlapping in self.near_boundary(rings, 0, limit, exclude) if overlapping]
+
+    # ---------- INTERNALS ----------
+
+    def _cell_range(self, box):
+        s, w, n, e = box
+        c = self.cell_deg
+        return (math.floor(s / c), math.floor(n / c)), (math.floor(w / c), math.floor(e / c))
+
+    def _cells_of(self, box):
+        (i0, i1), (j0, j1) = self._cell_range(box)
+        return [(i, j) for i in range(i0, i1 + 1) for j in range(j0, j1 + 1)]
+
+    def _candidates(self, box):
+        (i0, i1), (j0, j1) = self._cell_range(box)
+        cells = self._cells
+        found = set(self._oversize)
+        if (i1 - i0 + 1) * (j1 - j0 + 1) > len(cells):
+            # huge query box: walk the occupied cells instead of the empty ones
+            for (i, j), refs in cells.items():
+                if i0 <= i <= i1 and j0 <= j <= j1:
+                    found.update(refs)
+        else:
+            for i in range(i0, i1 + 1):
+                for j in range(j0, j1 + 1):
+                    refs = cells.get((i, j))
+                    if refs:
+                        found.update(refs)
+        return found
+
+    def _add(self, application):
+        entry = locate(application)
+        if entry is None:
+            return
+        ref_id = application['ref_id']
+        box = entry[0]
+        self._entries[ref_id] = entry
+        (i0, i1), (j0, j1) = self._cell_range(box)
+        if (i1 - i0 + 1) * (j1 - j0 + 1) > MAX_CELLS:
+            self._oversize.add(ref_id)
+            return
+        for cell in self._cells_of(box):
+            self._cells.setdefault(cell, set()).add(ref_id)
+
+    def _remove(self, ref_id):
+        entry = self._entries.pop(ref_id, None)
+        if entry is None:
+            return
+        if ref_id in self._oversize:
+            self._oversize.discard(ref_id)
+            return
+        for cell in self._cells_of(entry[0]):
+            refs = self._cells.get(cell)
+            if refs is not None:
+                refs.discard(ref_id)
+                if not refs:
+                    del self._cells[cell]
@@ -0,0 +1,317 @@
+import hashlib
+
+import numpy as np
+
+EARTH_RADIUS_M = 6371008.8
+METRES_PER_DEG = np.pi * EARTH_RADIUS_M / 180
+MAX_VERTICES = 500         # per boundary; a surveyed parcel needs far fewer, crossing checks are O(n²)
+CROSS_CHUNK = 256          # edge rows per self-intersection block (keeps each block at ~n×256 cells)
+MIN_AREA_M2 = 1.0
+TOUCH_M = 0.05             # vertices this close to a neighbour's edge are "on" it (shared border)
+HASH_SCALE = 1e7           # boundary hashes use 1e-7° (~1 cm) integer coordinates
+POLYLINE_PRECISION = 7     # stored boundaries keep the same ~1 cm grid
+ENCODING = f'polyline{POLYLINE_PRECISION}'
+
+
+def as_rings(rings):
+    """``(n, 2)`` float64 ``[lat, lng]`` arrays, closing duplicate vertex dropped"""
+    out = []
+    for ring in rings:
+        a = np.asarray(ring, dtype=np.float64).reshape(-1, 2)
+        if len(a) > 1 and (a[0] == a[-1]).all():
+            a = a[:-1]
+        out.append(a)
+    return out
+
+
+# ---------- COMPACT STORAGE (encoded polyline, Google's algorithm at 1e-7°) ----------
+
+def encode_ring(ring):
+    """One ring as an encoded polyline string: zigzag varints of quantized deltas"""
+    q = np.round(np.asarray(ring, dtype=np.float64).reshape(-1, 2) * 10 ** POLYLINE_PRECISION).astype(np.int64)
+    deltas = np.diff(q, axis=0, prepend=np.zeros((1, 2), dtype=np.int64)).ravel()
+    zigzag = np.where(deltas < 0, ~(deltas << 1), deltas << 1)
+    out = []
+    for value in zigzag.tolist():
+        while value >= 0x20:
+            out.append(chr((0x20 | (value & 0x1f)) + 63))
+            value >>= 5
+        out.append(chr(value + 63))
+    return ''.join(out)
+
+
+def decode_ring(text):
+    """``(n, 2)`` ``[lat, lng]`` array from ``encode_ring`` output, without a per-vertex Python loop"""
+    chunks = np.frombuffer(text.encode('ascii'), dtype=np.uint8).astype(np.int64) - 63
+    if len(chunks) == 0:
+        return np.zeros((0, 2))
+    ends = np.flatnonzero((chunks & 0x20) == 0)
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    shift = 5 * (np.arange(len(chunks)) - np.repeat(starts, ends - starts + 1))
+    values = np.add.reduceat((chunks & 0x1f) << shift, starts)
+    deltas = np.where(values & 1, ~(values >> 1), values >> 1).reshape(-1, 2)
+    return np.cumsum(deltas, axis=0) / 10 ** POLYLINE_PRECISION
+
+
+def is_encoded(boundary):
+    return isinstance(boundary, dict) and boundary.get('encoding') == ENCODING
+
+
+def encode_boundary(rings):
+    """Stored form of a boundary: ``{'encoding': 'polyline7', 'rings': [str, ...]}``"""
+    return {'encoding': ENCODING, 'rings': [encode_ring(ring) for ring in as_rings(rings)]}
+
+
+def decode_boundary(boundary):
+    return [decode_ring(text) for text in boundary.get('rings', [])]
+
+
+def to_geojson(rings):
+    """GeoJSON geometry for the map: ``[lng, lat]`` order, closed rings, one polygon per drawn ring"""
+    polygons = [[[[lng, lat] for lat, lng in np.vstack((r, r[:1])).tolist()]] for r in as_rings(rings)]
+    if len(polygons) == 1:
+        return {'type': 'Polygon', 'coordinates': polygons[0]}
+    return {'type': 'MultiPolygon', 'coordinates': polygons}
+
+
+def bounds(rings):
+    """``(south, west, north, east)`` of a list of ring arrays"""
+    points = np.concatenate(rings)
+    (south, west), (north, east) = points.min(0), points.max(0)
+    return float(south), float(west), float(north), float(east)
+
+
+def _ring_index(lengths):
+    """Start offsets plus next/previous vertex indices for rings stored end to end"""
+    lengths = np.asarray(lengths)
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    idx = np.arange(lengths.sum())
+    first = np.repeat(starts, lengths)
+    last = first + np.repeat(lengths, lengths) - 1
+    nxt = np.where(idx == last, first, idx + 1)
+    prv = np.where(idx == first, last, idx - 1)
+    return starts, nxt, prv
+
+
+def _measure_rings(rings):
+    """Geodesic ``(areas_m2, perimeters_m)`` of many rings in one pass"""
+    if not rings:
+        return np.zeros(0), np.zeros(0)
+    points = np.radians(np.concatenate(rings))
+    starts, nxt, prv = _ring_index([len(r) for r in rings])
+    lat, lng = points[:, 0], points[:, 1]
+    # spherical polygon area (Chamberlain & Duquette), as used by geojson-area/turf
+    terms = (lng[nxt] - lng[prv]) * np.sin(lat)
+    areas = np.abs(np.add.reduceat(terms, starts)) * EARTH_RADIUS_M ** 2 / 2
+    # haversine length of every edge
+    h = np.sin((lat[nxt] - lat) / 2) ** 2 + np.cos(lat) * np.cos(lat[nxt]) * np.sin((lng[nxt] - lng) / 2) ** 2
+    edges = 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(h, 0, 1)))
+    return areas, np.add.reduceat(edges, starts)
+
+
+def measure(rings):
+    """Area, perimeter and size of one boundary (its rings are separate drawn parts)"""
+    return measure_many([rings])[0]
+
+
+def measure_many(boundaries):
+    """``measure`` for a whole batch of boundaries, e.g. every parcel in a taluk"""
+    boundaries = [as_rings(rings) for rings in boundaries]
+    flat = [ring for rings in boundaries for ring in rings]
+    owner = np.repeat(np.arange(len(boundaries)), [len(rings) for rings in boundaries])
+    areas, perimeters = _measure_rings(flat)
+    areas = np.bincount(owner, areas, minlength=len(boundaries))
+    perimeters = np.bincount(owner, perimeters, minlength=len(boundaries))
+    return [{
+        'area_m2': round(float(area), 2),
+        'perimeter_m': round(float(perimeter), 2),
+        'rings': len(rings),
+        'vertices': int(sum(len(r) for r in rings)),
+    } for area, perimeter, rings in zip(areas, perimeters, boundaries)]
+
+
+# ---------- PLANAR TESTS (local metres around the query; parcels are small) ----------
+
+def _projector(rings):
+    lat0, lng0 = rings[0][0]
+    kx = METRES_PER_DEG * np.cos(np.radians(lat0))
+    return lambda a: np.column_stack(((a[:, 1] - lng0) * kx, (a[:, 0] - lat0) * METRES_PER_DEG))
+
+
+def _orient(a, b, c):
+    return (b[..., 0] - a[..., 0]) * (c[..., 1] - a[..., 1]) - (b[..., 1] - a[..., 1]) * (c[..., 0] - a[..., 0])
+
+
+def _crossings(p1, p2, q1, q2):
+    """``(m, k)`` proper crossings of segments p1→p2 with q1→q2 (touching doesn't count)"""
+    p1, p2 = p1[:, None, :], p2[:, None, :]
+    d1, d2 = _orient(q1, q2, p1), _orient(q1, q2, p2)
+    d3, d4 = _orient(p1, p2, q1), _orient(p1, p2, q2)
+    return (d1 * d2 < 0) & (d3 * d4 < 0)
+
+
+def _point_edges(points, a, b):
+    """``(m, k)`` distances from points to segments a→b, plus ray-cast crossings"""
+    d = b - a
+    ap = points[:, None, :] - a[None, :, :]
+    length = (d * d).sum(-1)
+    t = np.clip((ap * d).sum(-1) / np.where(length == 0, 1, length), 0, 1)
+    dist = np.hypot(ap[..., 0] - t * d[:, 0], ap[..., 1] - t * d[:, 1])
+    y = points[:, 1:2]
+    straddle = (a[:, 1] > y) != (b[:, 1] > y)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x_cross = a[:, 0] + (y - a[:, 1]) * d[:, 0] / d[:, 1]
+    return dist, straddle & (points[:, 0:1] < x_cross)
+
+
+def _edges_of(rings):
+    _, nxt, _ = _ring_index([len(r) for r in rings])
+    points = np.concatenate(rings)
+    return points, points[nxt]
+
+
+def contains(rings, lat, lng):
+    """True if a point lies inside ``rings`` (even-odd, so inner rings are holes)"""
+    rings = as_rings(rings)
+    if not rings:
+        return False
+    a, b = _edges_of(rings)
+    _, crossings = _point_edges(np.array([[lat, lng]], dtype=np.float64), a, b)
+    return bool(crossings.sum() % 2)
+
+
+def self_intersections(ring):
+    """Index pairs of non-adjacent edges that cross each other"""
+    a = _projector([ring])(ring)
+    b = np.roll(a, -1, axis=0)
+    n = len(a)
+    hits = [np.empty((0, 2), dtype=np.intp)]
+    for start in range(0, n, CROSS_CHUNK):
+        i, j = np.nonzero(_crossings(a[start:start + CROSS_CHUNK], b[start:start + CROSS_CHUNK], a, b))
+        i += start
+        # each pair once, skipping neighbours (the first and last edges share a vertex too)
+        keep = (j >= i + 2) & ~((i == 0) & (j == n - 1))
+        hits.append(np.column_stack((i[keep], j[keep])))
+    return np.concatenate(hits)
+
+
+def simplify(ring, tolerance_m):
+    """Douglas-Peucker: drop vertices closer than ``tolerance_m`` to the simplified outline"""
+    ring = as_rings([ring])[0]
+    if len(ring) <= 3 or tolerance_m <= 0:
+        return ring
+    points = _projector([ring])(ring)
+    points = np.vstack((points, points[:1]))
+    keep = np.zeros(len(points), dtype=bool)
+    keep[0] = keep[-1] = True
+    spans = [(0, len(points) - 1)]
+    while spans:
+        i, j = spans.pop()
+        if j - i < 2:
+            continue
+        dist, _ = _point_edges(points[i + 1:j], points[i:i + 1], points[j:j + 1])
+        k = int(dist[:, 0].argmax())
+        if dist[k, 0] > tolerance_m:
+            k += i + 1
+            keep[k] = True
+            spans += [(i, k), (k, j)]
+    return ring[keep[:-1]]
+
+
+def validate(rings):
+    """List of problems with a boundary (empty when it is usable)"""
+    rings = as_rings(rings)
+    if not rings:
+        return ['Boundary needs at least 3 points']
+    if sum(len(r) for r in rings) > MAX_VERTICES:
+        return [f'Boundary has more than {MAX_VERTICES} points']
+    problems = []
+    for i, ring in enumerate(rings, 1):
+        if not np.isfinite(ring).all():
+            problems.append(f'Ring {i}: coordinates must be numbers')
+        elif (np.abs(ring[:, 0]) > 90).any() or (np.abs(ring[:, 1]) > 180).any():
+            problems.append(f'Ring {i}: coordinate out of bounds')
+        elif len(np.unique(ring, axis=0)) < 3:
+            problems.append(f'Ring {i}: needs at least 3 distinct points')
+        elif len(self_intersections(ring)):
+            problems.append(f'Ring {i}: edges cross each other')
+        elif _measure_rings([ring])[0][0] < MIN_AREA_M2:
+            problems.append(f'Ring {i}: encloses no area')
+    return problems
+
+
+def boundary_hash(rings):
+    """Stable hash of a boundary: same parcel, same hash, whatever vertex or direction it starts from"""
+    digest = hashlib.sha256()
+    canonical = []
+    for ring in as_rings(rings):
+        q = np.round(ring * HASH_SCALE).astype(np.int64)
+        q = np.roll(q, -int(np.lexsort((q[:, 1], q[:, 0]))[0]), axis=0)
+        if _orient(q[-1].astype(float), q[0].astype(float), q[1 % len(q)].astype(float)) < 0:
+            q = np.roll(q[::-1], 1, axis=0)
+        canonical.append(q)
+    for q in sorted(canonical, key=lambda q: q.tobytes()):
+        digest.update(len(q).to_bytes(4, 'big') + q.tobytes())
+    return digest.hexdigest()
+
+
+def compare(rings, candidates):
+    """``(gaps_m, overlapping)`` arrays for ``rings`` against each candidate boundary.
+
+    Parcels that only share a border have a gap of 0 but do not overlap.
+
+    All candidates are tested in one batch: their edges are stacked into
+    a single array and every crossing, containment and distance check is
+    one broadcast against the query's vertices and edges.
+    """
+    if not candidates:
+        return np.zeros(0), np.zeros(0, dtype=bool)
+    rings = as_rings(rings)
+    candidates = [as_rings(c) for c in candidates]
+    project = _projector(rings)
+    query = [project(r) for r in rings]
+    flat = [project(r) for c in candidates for r in c]
+    ring_owner = np.repeat(np.arange(len(candidates)), [len(c) for c in candidates])
+    count = len(candidates)
+
+    qa, qb = _edges_of(query)
+    ca, cb = _edges_of(flat)
+    owner = np.repeat(ring_owner, [len(r) for r in flat])     # candidate of each vertex/edge
+
+    def per_candidate(values, ufunc, initial, index=owner):
+        out = np.full(count, initial, dtype=values.dtype)
+        ufunc.at(out, index, values)
+        return out
+
+    # probe with vertices and edge midpoints: overlapping parcels whose borders
+    # only touch or run along each other still have a midpoint inside the other
+    q_probe = np.concatenate((qa, (qa + qb) / 2))
+    c_probe = np.concatenate((ca, (ca + cb) / 2))
+    probe_owner = np.concatenate((owner, owner))
+
+    # query probes against every candidate edge
+    dist, ray = _point_edges(q_probe, ca, cb)                 # (m, K)
+    gap = per_candidate(dist.min(0), np.minimum, np.inf)
+    q_near = np.full((count, len(q_probe)), np.inf)
+    np.minimum.at(q_near, owner, dist.T)
+    q_parity = np.zeros((count, len(q_probe)), dtype=np.int64)
+    np.add.at(q_parity, owner, ray.T.astype(np.int64))
+    q_inside = ((q_parity % 2 == 1) & (q_near > TOUCH_M)).any(1)
+
+    # candidate probes against the query's edges
+    dist, ray = _point_edges(c_probe, qa, qb)                 # (K, m)
+    near = dist.min(1)
+    gap = np.minimum(gap, per_candidate(near, np.minimum, np.inf, probe_owner))
+    c_inside = (ray.sum(1) % 2 == 1) & (near > TOUCH_M)
+    c_inside = per_candidate(c_inside, np.logical_or, False, probe_owner)
+
+    # edges crossing, or the same outline drawn twice (every vertex on the other's border)
+    crossed = per_candidate(_crossings(qa, qb, ca, cb).any(0), np.logical_or, False)
+    centre = qa.mean(0, keepdims=True)
+    dist, ray = _point_edges(centre, ca, cb)
+    parity = per_candidate(ray[0].astype(np.int64), np.add, 0)
+    same = (parity % 2 == 1) & (per_candidate(dist[0], np.minimum, np.inf) > TOUCH_M) & (gap <= TOUCH_M)
+
+    overlapping = q_inside | c_inside | crossed | same
+    gap[overlapping] = 0.0
+    return gap, overlapping
@@ -0,0 +1,52 @@
+import json
+import os
+import threading
+from types import MappingProxyType
+
+TRANSLATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'translations')
+DEFAULT_LOCALE = 'en'
+
+
+class Catalog:
+    """🌐 UI translations, one ``translations/<locale>.json`` file per language.
+
+    A locale is read the first time it is requested and kept as a read-only
+    mapping with the English strings merged underneath, so a render costs a
+    dict lookup no matter how many strings or languages the catalog holds.
+    """
+
+    def __init__(self, directory=TRANSLATIONS_DIR, default=DEFAULT_LOCALE):
+        self.directory = directory
+        self.default = default
+        self.locales = frozenset(
+            os.path.splitext(name)[0] for name in os.listdir(directory) if name.endswith('.json')
+        )
+        self._loaded = {}
+        self._lock = threading.RLock()
+
+    def resolve(self, code):
+        """Known locale code, else the default (cookie values never reach the filesystem)"""
+        return code if code in self.locales else self.default
+
+    def get(self, code):
+        code = self.resolve(code)
+        table = self._loaded.get(code)
+        if table is None:
+            with self._lock:
+                table = self._loaded.get(code)
+                if table is None:
+                    table = self._loaded[code] = self._load(code)
+        return table
+
+    def _load(self, code):
+        with open(os.path.join(self.directory, f'{code}.json'), encoding='utf-8') as f:
+            strings = json.load(f)
+        if code != self.default:
+            strings = dict(self.get(self.default), **strings)
+        return MappingProxyType(strings)
+
+    def gettext(self, code, key, default=None):
+        return self.get(code).get(key, key if default is None else default)
+
+
+catalog = Catalog()
@@ -0,0 +1,170 @@
+import difflib
+import re
+from functools import lru_cache
+
+from .search import normalize, tokenize
+
+FUZZY_CUTOFF = 0.8        # difflib ratio for a misspelt keyword ("verfy", "pendng")
+FUZZY_MIN_LEN = 4
+PUNCTUATION = re.compile(r'[!?.,;:"\'()\[\]।॥]+')
+
+# Intent -> keywords in English and the nine Indian languages of inject_language
+# (ta, kn, te, ml, hi, bn, mr, gu, pa). Order breaks ties between intents.
+KEYWORDS = {
+    'hello': ['hello', 'hi', 'hey', 'vanakkam', 'namaste',
+              'வணக்கம்', 'ನಮಸ್ಕಾರ', 'నమస్కారం', 'നമസ്കാരം', 'नमस्ते', 'নমস্কার', 'नमस्कार', 'નમસ્તે', 'ਨਮਸਤੇ', 'ਸਤ ਸ੍ਰੀ ਅਕਾਲ'],
+    'help': ['help', 'commands', 'menu', 'options',
+             'உதவி', 'ಸಹಾಯ', 'సహాయం', 'സഹായം', 'मदद', 'सहायता', 'সাহায্য', 'मदत', 'મદદ', 'ਮਦਦ'],
+    'stats': ['stats', 'statistics', 'count', 'total', 'report', 'summary',
+              'புள்ளிவிவரம்', 'ಅಂಕಿಅಂಶ', 'గణాంకాలు', 'സ്ഥിതിവിവരക്കണക്ക്', 'आंकड़े', 'পরিসংখ্যান', 'आकडेवारी', 'આંકડા', 'ਅੰਕੜੇ'],
+    'pending': ['pending', 'waiting', 'queue', 'backlog',
+                'நிலுவை', 'ಬಾಕಿ', 'పెండింగ్', 'തീർപ്പാക്കാത്ത', 'लंबित', 'অমীমাংসিত', 'प्रलंबित', 'બાકી', 'ਬਕਾਇਆ'],
+    'track': ['track', 'tracking', 'ref', 'reference', 'where',
+              'பின்தொடர', 'ಟ್ರ್ಯಾಕ್', 'ట్రాక్', 'ട്രാക്ക്', 'ट्रैक', 'ট্র্যাক', 'मागोवा', 'ટ્રેક', 'ਟਰੈਕ'],
+    'status': ['status', 'progress', 'state',
+               'நிலை', 'ಸ್ಥಿತಿ', 'స్థితి', 'നില', 'स्थिति', 'অবস্থা', 'स्थिती', 'સ્થિતિ', 'ਸਥਿਤੀ'],
+    'approve': ['approve', 'approval', 'approved', 'accept',
+                'ஒப்புதல்', 'ಅನುಮೋದನೆ', 'ఆమోదం', 'അംഗീകാരം', 'स्वीकृति', 'मंजूरी', 'অনুমোদন', 'मंजुरी', 'મંજૂરી', 'ਮਨਜ਼ੂਰੀ'],
+    'verify': ['verify', 'verification', 'ai', 'gemini', 'analyze',
+               'சரிபார்ப்பு', 'ಪರಿಶೀಲನೆ', 'ధృవీకరణ', 'സ്ഥിരീകരണം', 'सत्यापन', 'যাচাই', 'तपासणी', 'ચકાસણી', 'ਜਾਂਚ'],
+    'documents': ['documents', 'document', 'docs', 'papers', 'aadhar', 'deed',
+                  'ஆவணங்கள்', 'ஆவணம்', 'ದಾಖಲೆಗಳು', 'పత్రాలు', 'രേഖകൾ', 'दस्तावेज़', 'दस्तावेज', 'নথি', 'कागदपत्रे', 'દસ્તાવેજો', 'ਦਸਤਾਵੇਜ਼'],
+    'submit': ['submit', 'apply', 'application', 'new',
+               'சமர்ப்பி', 'விண்ணப்பம்', 'ಸಲ್ಲಿಸು', 'సమర్పించు', 'സമർപ്പിക്കുക', 'जमा', 'आवेदन', 'জমা', 'सादर', 'સબમિટ', 'ਜਮ੍ਹਾਂ'],
+    'patta': ['patta', 'pattadar', 'land', 'certificate',
+              'பட்டா', 'ಪಟ್ಟಾ', 'పట్టా', 'പട്ട', 'पट्टा', 'পট্টা', 'પટ્ટા', 'ਪਟਟਾ'],
+}
+
+ADMIN_REPLIES = {
+    'hello': '👋 Hi Admin! {pending} pending, {total} total apps.',
+    'help': '''✅ ADMIN COMMANDS:
+    • "stats" - Full statistics
+    • "pending" - List pending apps
+    • "approve" - Approval steps
+    • "verify" - AI verification
+    • "patta" - Process overview''',
+    'stats': '📊 ADMIN STATS:\n• Total: {total}\n• Pending: {pending}\n• Approved: {approved}\n• Rejected: {rejected}',
+    'pending': '⏳ PENDING ({pending}):\nUse "AI Verify All Pending" or click AI Verify per application!',
+    'approve': '✅ APPROVE: Status dropdown → "Approved" → Auto-save!',
+    'verify': '🤖 AI VERIFY: Analyzes docs → Approve/Reject + Score 1-10 ({ai_analyzed} analyzed so far)',
+    'patta': '📄 ADMIN: Verify → Approve → Issue digital Patta!',
+    'default': '🤖 Not sure about that. Type "help" for commands.',
+}
+
+REPLIES = {
+    'admin': ADMIN_REPLIES,
+    'staff': dict(ADMIN_REPLIES,
+                  hello='👋 Hi! {pending} applications are waiting for verification.',
+                  help=ADMIN_REPLIES['help'].replace('ADMIN', 'STAFF')),
+    'citizen': {
+        'hello': '👋 Welcome Citizen! Track your {pending} applications.',
+        'help': '''✅ CITIZEN COMMANDS:
+    • "track" - Track Ref ID
+    • "status" - Check status
+    • "documents" - Required docs
+    • "submit" - Submit guide
+    • "patta" - What is Patta?''',
+        'track': '🔍 TRACK: Enter Ref ID (PATTA-XXXX). {pending} pending apps.',
+        'status': '📋 STATUS: {pending} pending. Check dashboard!',
+        'pending': '📋 STATUS: {pending} pending. Check dashboard!',
+        'documents': '''📄 REQUIRED (5 DOCS):
+    1. Parent document
+    2. Sale deed
+    3. Aadhar card
+    4. Encumbrance cert
+    5. Layout scan''',
+        'submit': '''📤 SUBMIT:
+    1. "New Application"
+    2. Draw map boundary
+    3. Upload 5 docs
+    4. Get Ref ID instantly!''',
+        'patta': '🏆 PATTA = Digital land ownership certificate!',
+        'default': '🤖 Not sure about that. Type "help" for commands.',
+    },
+    'guest': {
+        'default': '👋 Login as admin/citizen@test.com (123456)',
+    },
+}
+
+PRIORITY = {intent: i for i, intent in enumerate(KEYWORDS)}
+
+
+def _compile():
+    """keyword -> intent for single tokens, plus the multi-word phrases"""
+    words, phrases = {}, {}
+    for intent, keywords in KEYWORDS.items():
+        for keyword in keywords:
+            keyword = normalize(keyword)
+            (phrases if ' ' in keyword else words).setdefault(keyword, intent)
+    return words, phrases
+
+
+WORDS, PHRASES = _compile()
+_VOCABULARY = [w for w in WORDS if len(w) >= FUZZY_MIN_LEN]
+
+
+@lru_cache(maxsize=4096)
+def _fuzzy(token):
+    match = difflib.get_close_matches(token, _VOCABULARY, n=1, cutoff=FUZZY_CUTOFF)
+    return WORDS[match[0]] if match else None
+
+
+def match_intent(message, allowed=None):
+    """Best intent for a message, or None. Exact keyword hits outweigh fuzzy ones."""
+    text = normalize(PUNCTUATION.sub(' ', message or ''))
+    if not text:
+        return None
+    scores = {}
+    for phrase, intent in PHRASES.items():
+        if phrase in text:
+            scores[intent] = scores.get(intent, 0) + 1.0
+    for token in tokenize(text):
+        intent, weight = WORDS.get(token), 1.0
+        if intent is None and len(token) >= FUZZY_MIN_LEN:
+            intent, weight = _fuzzy(token), 0.8
+        if intent is not None:
+            scores[intent] = scores.get(intent, 0) + weight
+    if allowed is not None:
+        scores = {i: s for i, s in scores.items() if i in allowed}
+    if not scores:
+        return None
+    return min(scores, key=lambda i: (-scores[i], PRIORITY[i]))
+
+
+class LiveCounts(dict):
+    """Template values computed only when a reply actually mentions them"""
+
+    def __init__(self, counters):
+        super().__init__()
+        self.counters = counters
+
+    def __missing__(self, key):
+        if key == 'total':
+            value = self.counters.total
+        elif key == 'ai_analyzed':
+            value = self.counters.ai_analyzed
+        else:
+            value = self.counters.status(key)
+        self[key] = value
+        return value
+
+
+class IntentRouter:
+    """💬 Precompiled role-specific chat replies for the dashboard assistant.
+
+    Keywords and templates are compiled once at import; each message costs
+    a tokenize, a few dict lookups (plus a cached fuzzy match for unknown
+    words) and O(1) counter reads for the numbers in the chosen reply.
+    """
+
+    def __init__(self, counters, replies=REPLIES):
+        self.counters = counters
+        self.replies = replies
+        self.allowed = {role: frozenset(r) - {'default'} for role, r in replies.items()}
+
+    def reply(self, role, message):
+        """``(intent, text)``; intent is None when nothing matched (text is the role default)"""
+        replies = self.replies.get(role, self.replies['guest'])
+        intent = match_intent(message, self.allowed.get(role, self.allowed['guest']))
+        template = replies[intent] if intent else replies['default']
+        return intent, template.format_map(LiveCounts(self.counters))
@@ -0,0 +1,262 @@
+import heapq
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from datetime import datetime
+
+from .journal import Journal
+
+ACTIVE = ('queued', 'running')
+KEEP_FINISHED = 5000        # finished jobs kept in memory (older ones only live on in the counts)
+KEEP_BATCHES = 1000         # finished batches whose progress can still be asked for
+PROGRESS_EVERY = 1.0        # seconds between progress notifications per batch
+
+
+class JobQueue:
+    """⚙️ Persistent background jobs with a bounded worker pool.
+
+    Job state lives in its own journal (like the blob manifest), so queued
+    and interrupted jobs resume after a restart. ``workers`` bounds
+    concurrency and ``per_minute`` spaces job starts so bulk runs stay
+    under the model's quota. Failures are retried with exponential backoff
+    up to ``max_attempts``.
+
+    Progress comes from per-batch status counters, so polling it costs O(1)
+    however many jobs ran, and only the newest ``KEEP_FINISHED`` finished
+    jobs stay in memory. Listeners get throttled per-batch progress, not
+    one call per job state change.
+    """
+
+    def __init__(self, snapshot_path, workers=2, per_minute=60, max_attempts=3, backoff=5.0):
+        self.journal = Journal(snapshot_path, compact_every=2000)
+        self.workers = workers
+        self.interval = 60.0 / per_minute if per_minute else 0
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.handlers = {}
+        self.listeners = []
+        self.jobs = {}
+        self._finished = OrderedDict()   # finished job ids, oldest first
+        self._batches = OrderedDict()    # batch -> Counter of job statuses
+        self._totals = Counter()
+        self._announced = {}             # batch -> monotonic time of its last notification
+        self._active = {}            # (kind, ref_id) -> job id
+        self._ready = []             # heap of (not_before, seq, job id)
+        self._seq = 0
+        self._next_start = 0.0
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+
+    def register(self, kind, handler):
+        """``handler(job)`` does the work and returns a JSON-able result"""
+        self.handlers[kind] = handler
+
+    def add_listener(self, fn):
+        """``fn(progress)`` with a batch's ``progress()``, at most every PROGRESS_EVERY s (and when it finishes)"""
+        self.listeners.append(fn)
+
+    def open(self):
+        snapshot = self.journal.read_snapshot() or {}
+        counted = 'totals' in snapshot   # older snapshots only have the jobs
+        self._totals = Counter(snapshot.get('totals', {}))
+        self._batches = OrderedDict((b, Counter(c)) for b, c in snapshot.get('batches', []))
+        for job in snapshot.get('jobs', []):
+            self.jobs[job['id']] = job
+            if not counted:
+                self._count(job, 1)
+        for record in self.journal.read_records(snapshot.get('journal_seq', 0)):
+            job = record['job']
+            old = self.jobs.get(job['id'])
+            if old is not None:
+                self._count(old, -1)
+            self.jobs[job['id']] = job
+            self._count(job, 1)
+        resumed = 0
+        with self._lock:
+            for job in sorted(self.jobs.values(), key=lambda j: j['updated_at']):
+                if job['status'] in ACTIVE:
+                    self._set_status(job, 'queued')
+                    self._schedule(job, 0)
+                    resumed += 1
+                else:
+                    self._retire(job)
+        self.journal.open(self._snapshot)
+        for i in range(self.workers):
+            threading.Thread(target=self._worker, name=f'job-worker-{i}', daemon=True).start()
+        print(f"✅ Job queue: {self.workers} workers, {resumed} jobs resumed")
+        return self
+
+    def _snapshot(self):
+        with self._lock:
+            return {
+                'jobs': [dict(j) for j in self.jobs.values()],
+                'batches': [[b, dict(c)] for b, c in self._batches.items()],
+                'totals': dict(self._totals),
+            }
+
+    # ---------- ENQUEUE ----------
+
+    def enqueue(self, kind, ref_id, requested_by=None, batch=None):
+        """Queue one job; an identical job already queued or running is returned instead"""
+        with self._lock:
+            existing = self._active.get((kind, ref_id))
+            if existing:
+                return self.jobs[existing], False
+            now = datetime.now().isoformat()
+            job = {
+                'id': uuid.uuid4().hex[:12],
+                'kind': kind,
+                'ref_id': ref_id,
+                'batch': batch,
+                'status': None,
+                'attempts': 0,
+                'error': None,
+                'result': None,
+                'requested_by': requested_by,
+                'created_at': now,
+                'updated_at': now,
+            }
+            self.jobs[job['id']] = job
+            self._set_status(job, 'queued')
+            self._schedule(job, 0)
+        self._save(job)
+        return job, True
+
+    def enqueue_many(self, kind, ref_ids, requested_by=None):
+        batch = uuid.uuid4().hex[:12]
+        queued = sum(1 for ref_id in ref_ids if self.enqueue(kind, ref_id, requested_by, batch)[1])
+        return batch, queued
+
+    def _schedule(self, job, delay):
+        self._active[(job['kind'], job['ref_id'])] = job['id']
+        self._seq += 1
+        heapq.heappush(self._ready, (time.time() + delay, self._seq, job['id']))
+        self._cond.notify()
+
+    # ---------- WORKERS ----------
+
+    def _worker(self):
+        while True:
+            job = self._claim()
+            try:
+                result = self.handlers[job['kind']](job)
+            except Exception as e:
+                self._finish(job, error=e)
+            else:
+                self._finish(job, result=result)
+
+    def _claim(self):
+        with self._lock:
+            while True:
+                now = time.time()
+                if self._ready and self._ready[0][0] <= now and self._next_start <= now:
+                    _, _, job_id = heapq.heappop(self._ready)
+                    self._next_start = now + self.interval
+                    job = self.jobs[job_id]
+                    self._set_status(job, 'running')
+                    job['attempts'] += 1
+                    job['updated_at'] = datetime.now().isoformat()
+                    break
+                wake = max(self._ready[0][0] if self._ready else now + 60, self._next_start)
+                self._cond.wait(max(0.01, wake - now))
+        self._save(job)
+        return job
+
+    def _finish(self, job, result=None, error=None):
+        with self._lock:
+            job['updated_at'] = datetime.now().isoformat()
+            if error is None:
+                self._set_status(job, 'done')
+                job['result'] = result
+                job['error'] = None
+            elif job['attempts'] < self.max_attempts:
+                self._set_status(job, 'queued')
+                job['error'] = str(error)[:500]
+                self._schedule(job, self.backoff * 2 ** (job['attempts'] - 1))
+            else:
+                self._set_status(job, 'failed')
+                job['error'] = str(error)[:500]
+            if job['status'] not in ACTIVE:
+                self._active.pop((job['kind'], job['ref_id']), None)
+                self._retire(job)
+        if error is not None:
+            print(f"❌ Job {job['id']} ({job['ref_id']}) attempt {job['attempts']}: {error}")
+        self._save(job)
+
+    def _save(self, job):
+        self.journal.append({'op': 'job', 'job': dict(job)}, wait=False)
+        batch = job['batch']
+        if batch is None or not self.listeners:
+            return
+        now = time.monotonic()
+        with self._lock:
+            progress = self._progress(batch)
+            if not progress['finished'] and now - self._announced.get(batch, 0) < PROGRESS_EVERY:
+                return
+            if progress['finished']:
+                self._announced.pop(batch, None)
+            else:
+                self._announced[batch] = now
+        for fn in self.listeners:
+            try:
+                fn(progress)
+            except Exception as e:
+                print(f"❌ Job listener failed: {e}")
+
+    # ---------- BOOKKEEPING (under the lock) ----------
+
+    def _count(self, job, delta):
+        self._totals[job['status']] += delta
+        if job['batch'] is not None:
+            counts = self._batches.get(job['batch'])
+            if counts is None:
+                counts = self._batches[job['batch']] = Counter()
+                self._trim_batches()
+            counts[job['status']] += delta
+
+    def _set_status(self, job, status):
+        if job['status'] is not None:
+            self._count(job, -1)
+        job['status'] = status
+        self._count(job, 1)
+
+    def _retire(self, job):
+        """Remember a finished job, forgetting the oldest beyond KEEP_FINISHED"""
+        self._finished[job['id']] = None
+        while len(self._finished) > KEEP_FINISHED:
+            old_id, _ = self._finished.popitem(last=False)
+            self.jobs.pop(old_id, None)
+
+    def _trim_batches(self):
+        if len(self._batches) <= KEEP_BATCHES:
+            return
+        for batch in list(self._batches):
+            counts = self._batches[batch]
+            if not (counts['queued'] or counts['running']):
+                del self._batches[batch]
+                return
+
+    # ---------- READS ----------
+
+    def get(self, job_id):
+        job = self.jobs.get(job_id)
+        return dict(job) if job else None
+
+    def progress(self, batch=None):
+        """Status counts for one batch (or everything)"""
+        with self._lock:
+            return self._progress(batch)
+
+    def _progress(self, batch):
+        counts = self._totals if batch is None else self._batches.get(batch, Counter())
+        total = sum(counts[s] for s in ('queued', 'running', 'done', 'failed'))
+        return {
+            'batch': batch,
+            'total': total,
+            'queued': counts['queued'],
+            'running': counts['running'],
+            'done': counts['done'],
+            'failed': counts['failed'],
+            'finished': counts['done'] + counts['failed'] == total,
+        }
@@ -0,0 +1,183 @@
+import json
+import os
+import threading
+
+
+class Journal:
+    """📜 Append-only write-ahead log in front of a JSON snapshot file.
+
+    Every mutation is written as one JSON line. A single flusher thread
+    fsyncs whatever has piled up since its last pass, so concurrent writers
+    share one fsync (group commit). Once enough records have accumulated the
+    journal is compacted: a fresh snapshot is written next to the old one in
+    a background thread and atomically swapped in, and only the records that
+    arrived during the compaction are kept in the journal.
+    """
+
+    def __init__(self, snapshot_path, journal_path=None, compact_every=1000, sync_timeout=2.0):
+        self.snapshot_path = snapshot_path
+        self.journal_path = journal_path or os.path.splitext(snapshot_path)[0] + '.journal'
+        self.compact_every = compact_every
+        self.sync_timeout = sync_timeout
+
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._io_lock = threading.Lock()
+        self._fh = None
+        self._snapshot_fn = None
+        self._seq = 0
+        self._synced_seq = 0
+        self._since_compact = 0
+        self._tail = None          # lines appended while a compaction is running
+        self._compacting = False
+        self._closed = False
+
+    # ---------- STARTUP / REPLAY ----------
+
+    def read_snapshot(self):
+        """Return the snapshot dict, or None if there is no snapshot yet"""
+        if not os.path.exists(self.snapshot_path):
+            return None
+        with open(self.snapshot_path, 'r') as f:
+            snapshot = json.load(f)
+        # a compaction can leave an empty journal: keep numbering after the snapshot
+        self._seq = max(self._seq, snapshot.get('journal_seq', 0))
+        return snapshot
+
+    def read_records(self, after_seq=0):
+        """Yield journal records newer than ``after_seq`` (stops at a torn tail line)"""
+        self._seq = max(self._seq, after_seq)
+        if not os.path.exists(self.journal_path):
+            return
+        with open(self.journal_path, 'r') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                seq = record.get('seq', 0)
+                self._seq = max(self._seq, seq)
+                if seq > after_seq:
+                    yield record
+
+    def open(self, snapshot_fn):
+        """Start accepting appends. ``snapshot_fn`` returns the full state to compact into"""
+        self._snapshot_fn = snapshot_fn
+        self._synced_seq = self._seq
+        self._repair_tail()
+        self._fh = open(self.journal_path, 'a')
+        threading.Thread(target=self._flusher, name='journal-flusher', daemon=True).start()
+
+    def _repair_tail(self):
+        """Cut a torn last line (crash mid-write) so new records don't append onto it"""
+        if not os.path.exists(self.journal_path):
+            return
+        good, newline = 0, True
+        with open(self.journal_path, 'rb+') as f:
+            for line in f:
+                try:
+                    json.loads(line)
+                except ValueError:
+                    break
+                good += len(line)
+                newline = line.endswith(b'\n')
+            size = f.seek(0, os.SEEK_END)
+            if good < size:
+                f.truncate(good)
+                print(f"⚠️ Journal {os.path.basename(self.journal_path)}: dropped {size - good} bytes of torn tail")
+            if not newline:
+                f.seek(good)
+                f.write(b'\n')   # complete record that lost only its newline
+
+    # ---------- WRITES ----------
+
+    def append(self, record, wait=True):
+        """Append one record; with ``wait`` block until it is on disk. Returns its seq"""
+        line_record = dict(record)
+        with self._lock:
+            self._seq += 1
+            seq = line_record['seq'] = self._seq
+            line = json.dumps(line_record) + '\n'
+            self._fh.write(line)
+            self._fh.flush()
+            if self._tail is not None:
+                self._tail.append(line)
+            self._since_compact += 1
+            start_compaction = self._since_compact >= self.compact_every and not self._compacting
+            if start_compaction:
+                self._compacting = True
+            self._cond.notify_all()
+
+            if wait:
+                while self._synced_seq < seq and not self._closed:
+                    if not self._cond.wait(self.sync_timeout):
+                        break
+
+        if start_compaction:
+            threading.Thread(target=self.compact, name='journal-compact', daemon=True).start()
+        return seq
+
+    def _flusher(self):
+        while True:
+            with self._lock:
+                while self._synced_seq >= self._seq and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                target = self._seq
+            with self._io_lock:
+                try:
+                    os.fsync(self._fh.fileno())
+                except (OSError, ValueError) as e:
+                    print(f"❌ Journal fsync failed: {e}")
+            with self._lock:
+                self._synced_seq = max(self._synced_seq, target)
+                self._cond.notify_all()
+
+    # ---------- COMPACTION ----------
+
+    def compact(self):
+        """Write a new snapshot and drop the journal records it covers"""
+        try:
+            with self._lock:
+                snap_seq = self._seq
+                self._tail = []
+                self._since_compact = 0
+                state = self._snapshot_fn()
+
+            state['journal_seq'] = snap_seq
+            tmp_path = self.snapshot_path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(state, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.snapshot_path)
+
+            with self._lock, self._io_lock:
+                tmp_path = self.journal_path + '.tmp'
+                with open(tmp_path, 'w') as f:
+                    f.writelines(self._tail)
+                    f.flush()
+                    os.fsync(f.fileno())
+                self._fh.close()
+                os.replace(tmp_path, self.journal_path)
+                self._fh = open(self.journal_path, 'a')
+                print(f"💾 Snapshot compacted at seq {snap_seq} ({len(self._tail)} records carried over)")
+                self._tail = None
+        except Exception as e:
+            print(f"❌ Compaction failed: {e}")
+            with self._lock:
+                self._tail = None
+        finally:
+            with self._lock:
+                self._compacting = False
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            self._cond.notify_all()
+        with self._io_lock:
+            if self._fh and not self._fh.closed:
+                self._fh.flush()
+                os.fsync(self._fh.fileno())
+                self._fh.close()
@@ -0,0 +1,83 @@
+import gzip
+import hashlib
+import os
+
+from flask import Response, render_template, request, session
+
+from .cache import TTLCache
+from .i18n import catalog
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+
+def templates_version(template_dir):
+    """Fingerprint of every template, so a deploy with changed templates starts a fresh cache"""
+    digest = hashlib.sha256(os.environ.get('APP_VERSION', '').encode())
+    for root, _, files in sorted(os.walk(template_dir)):
+        for name in sorted(files):
+            with open(os.path.join(root, name), 'rb') as f:
+                digest.update(name.encode() + f.read())
+    return digest.hexdigest()[:16]
+
+
+class PageCache:
+    """🗜️ Rendered dashboard pages keyed by (template, locale, role, name).
+
+    Each page is rendered once per key, compressed once (gzip, plus brotli
+    when installed) and then served from memory with an ETag, so repeat
+    loads and revalidations never reach Jinja. The key includes a version
+    of the templates, so a deploy invalidates everything.
+    """
+
+    def __init__(self, app, maxsize=256):
+        self.app = app
+        self.version = templates_version(os.path.join(app.root_path, app.template_folder))
+        self.pages = TTLCache(maxsize=maxsize, ttl=24 * 3600)
+
+    def render(self, template):
+        locale = catalog.resolve(request.cookies.get('lang', 'en'))
+        key = (template, locale, session.get('role'), session.get('name'), self.version)
+        page = None if self.app.config.get('TEMPLATES_AUTO_RELOAD') else self.pages.get(key)
+        if page is None:
+            page = self._build(render_template(template), key)
+            self.pages.set(key, page)
+
+        # one strong ETag per representation, so a shared cache never revalidates gzip against br
+        accepted = request.accept_encodings
+        if page['br'] is not None and accepted['br']:
+            encoding = 'br'
+        elif accepted['gzip']:
+            encoding = 'gzip'
+        else:
+            encoding = 'identity'
+        etag = f"{page['etag']}-{encoding}"
+
+        response = Response(mimetype='text/html')
+        response.set_etag(etag)
+        response.cache_control.private = True
+        response.cache_control.no_cache = True   # always revalidate: the page depends on the session
+        response.vary.add('Accept-Encoding')
+        response.vary.add('Cookie')
+        if request.if_none_match.contains(etag):
+            response.status_code = 304
+            return response
+
+        if encoding == 'identity':
+            response.set_data(page['body'])
+        else:
+            response.set_data(page[encoding])
+            response.content_encoding = encoding
+        return response
+
+    @staticmethod
+    def _build(html, key):
+        body = html.encode('utf-8')
+        return {
+            'body': body,
+            'gzip': gzip.compress(body, compresslevel=9, mtime=0),
+            'br': brotli.compress(body) if brotli else None,
+            'etag': hashlib.sha256(repr(key).encode() + body).hexdigest()[:32],
+        }
@@ -0,0 +1,84 @@
+import base64
+import json
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+# sort param -> (store sort index, descending). Older submissions have been
+# pending longer, so days_pending is just submitted_at in reverse.
+SORTS = {
+    'submitted_at': ('submitted_at', False),
+    '-submitted_at': ('submitted_at', True),
+    'days_pending': ('submitted_at', True),
+    '-days_pending': ('submitted_at', False),
+    'district': ('district', False),
+    '-district': ('district', True),
+}
+
+PAGE_PARAMS = ('limit', 'cursor', 'sort', 'fields')
+
+
+def wants_page(args):
+    """Old clients that send none of the paging params still get the full list"""
+    return any(param in args for param in PAGE_PARAMS)
+
+
+def encode_cursor(sort, key):
+    raw = json.dumps({'s': sort, 'k': list(key)}, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor, sort):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        data = json.loads(raw)
+        value, ref_id = data['k']
+    except (ValueError, KeyError, TypeError):
+        raise ValueError('Invalid cursor')
+    # sort keys are (str, str): anything else would make bisect compare int with str
+    if not isinstance(value, str) or not isinstance(ref_id, str):
+        raise ValueError('Invalid cursor')
+    if data.get('s') != sort:
+        raise ValueError('Cursor belongs to a different sort order')
+    return (value, ref_id)
+
+
+def parse_page_args(args, default_sort='-submitted_at'):
+    """Validate limit/cursor/sort/fields query params (raises ValueError)"""
+    sort = args.get('sort', default_sort)
+    if sort not in SORTS:
+        raise ValueError(f"Invalid sort, use one of: {', '.join(SORTS)}")
+    field, descending = SORTS[sort]
+
+    try:
+        limit = int(args.get('limit', DEFAULT_LIMIT))
+    except ValueError:
+        raise ValueError('Invalid limit')
+    limit = max(1, min(limit, MAX_LIMIT))
+
+    cursor = args.get('cursor')
+    fields = [f.strip() for f in args.get('fields', '').split(',') if f.strip()]
+    return {
+        'sort': sort,
+        'field': field,
+        'descending': descending,
+        'after': decode_cursor(cursor, sort) if cursor else None,
+        'limit': limit,
+        'fields': fields,
+    }
+
+
+def project(record, fields):
+    """Keep only the requested fields (ref_id is always returned)"""
+    if not fields:
+        return record
+    return {f: record[f] for f in ['ref_id', *fields] if f in record}
+
+
+def page_response(page, items, next_key, **extra):
+    return dict({
+        'items': [project(item, page['fields']) for item in items],
+        'next_cursor': encode_cursor(page['sort'], next_key) if next_key else None,
+        'sort': page['sort'],
+        'limit': page['limit'],
+    }, **extra)
@@ -1,24 +1,37 @@
 from flask import Blueprint, request, jsonify
-import firebase_admin
-from firebase_admin import firestore, storage, credentials
 from functools import wraps
 import os
 from dotenv import load_dotenv
 import uuid
 import time
 from hashlib import sha256
-import firebase_admin
 
-# Load environment & initialize Firebase
+from .ratelimit import limiter, scope_for
+from . import sessions
+from . import audit
+from . import geometry
+from .geo import parse_rings
+from .startup import LazyModule, LazyObject
+
+firestore = LazyModule('firebase_admin.firestore')
+storage = LazyModule('firebase_admin.storage')
+
+# Load environment
 load_dotenv()
-if not firebase_admin._apps:
-    cred = credentials.Certificate(os.getenv('FIREBASE_SERVICE_ACCOUNT_PATH'))
-    firebase_admin.initialize_app(cred, {
-        'projectId': os.getenv('FIREBASE_PROJECT_ID'),
-    })
 
-# Global Firestore client
-db = firestore.client()
+def init_firestore():
+    """Initialize Firebase on the first Firestore call, not at import"""
+    import firebase_admin
+    from firebase_admin import credentials
+    if not firebase_admin._apps:
+        cred = credentials.Certificate(os.getenv('FIREBASE_SERVICE_ACCOUNT_PATH'))
+        firebase_admin.initialize_app(cred, {
+            'projectId': os.getenv('FIREBASE_PROJECT_ID'),
+        })
+    return firestore.client()
+
+# Global Firestore client (created lazily)
+db = LazyObject(init_firestore)
 
 patta_bp = Blueprint('patta', __name__, url_prefix='/api/patta')
 
@@ -32,15 +45,19 @@ def token_required(f):
             return jsonify({'error': 'Token required'}), 401
         
         try:
-            from firebase_admin import auth
-            decoded = auth.verify_id_token(token)
-            uid = decoded['uid']
-            user_doc = db.collection('users').document(uid).get()
+            uid = sessions.verified_tokens.get(token)
+            if uid is None:
+                from firebase_admin import auth
+                decoded = auth.verify_id_token(token)
+                uid = decoded['uid']
+                # never trust the token past its own expiry
+                ttl = min(sessions.verified_tokens.ttl, decoded.get('exp', 0) - time.time())
+                if ttl > 0:
+                    sessions.verified_tokens.set(token, uid, ttl)
             
-            if not user_doc.exists:
+            user_data = sessions.load_profile(db, uid)
+            if user_data is None:
                 return jsonify({'error': 'User not found'}), 404
-            
-            user_data = user_doc.to_dict()
             return f(*args, **kwargs, current_user=user_data, uid=uid)
         except Exception as e:
             return jsonify({'error': 'Invalid token'}), 401
@@ -58,23 +75,17 @@ def role_required(*roles):
         return decorated_function
     return decorator
 
-# ✅ FIXED: Rate limiting decorator (self-contained)
+# ✅ FIXED: Rate limiting decorator (shared limiter engine)
 def rate_limit(key="ip", limit=100, window=3600):
-    from collections import defaultdict
-    rate_limits = defaultdict(list)
     def decorator(f):
+        scope = scope_for(f)
         @wraps(f)
         def decorated_function(*args, **kwargs):
             from flask import request
             client_key = request.remote_addr if key == "ip" else key
-            now = time.time()
-            rate_limits[client_key] = [
-                req_time for req_time in rate_limits[client_key] 
-                if now - req_time < window
-            ]
-            if len(rate_limits[client_key]) >= limit:
-                return jsonify({'error': 'Rate limit exceeded'}), 429
-            rate_limits[client_key].append(now)
+            retry_after = limiter.hit(f"{scope}:{client_key}", limit, window)
+            if retry_after:
+                return jsonify({'error': 'Rate limit exceeded'}), 429, {'Retry-After': str(retry_after)}
             return f(*args, **kwargs)
         return decorated_function
     return decorator
@@ -134,27 +145,16 @@ def create_request(current_user, uid):
         }
     }
     
-    # ✅ FIXED: Atomic batch write
-    batch = db.batch()
-    batch.set(
-        db.collection('verification_requests').document(request_id), 
-        request_data
-    )
-    
-    # Immutable audit log
-    batch.set(
-        db.collection('audit_trails').document(f"request_create_{request_id}"),
-        {
-            'action': 'request_created',
-            'actorUid': uid,
-            'targetId': request_id,
-            'timestamp': firestore.SERVER_TIMESTAMP,
-            'immutable': True,
-            'data_hash': sha256(str(sorted(request_data.items())).encode()).hexdigest()
-        }
-    )
+    db.collection('verification_requests').document(request_id).set(request_data)
     
-    batch.commit()
+    # Immutable audit log (written asynchronously by the audit sink)
+    audit.emit(db, 'audit_trails', {
+        'action': 'request_created',
+        'actorUid': uid,
+        'targetId': request_id,
+        'immutable': True,
+        'data_hash': sha256(str(sorted(request_data.items())).encode()).hexdigest()
+    }, doc_id=f"request_create_{request_id}")
     return jsonify({'requestId': request_id, 'status': 'created'}), 201
 
 def list_requests(current_user, uid):
@@ -199,51 +199,34 @@ def boundaries(patta_id, current_user, uid):
         from .security import sanitize_input
         data = sanitize_input(data)
         
-        # Validate coordinates (prevent malicious geo-data)
+        # Validate coordinates (prevent malicious geo-data) - whole rings as arrays
         coords = data.get('coordinates', [])
-        if not coords or len(coords) < 3:
-            return jsonify({'error': 'Invalid boundary coordinates (min 3 points)'}), 400
-        
-        # Validate coordinate format
-        try:
-            for coord_set in coords:
-                if not isinstance(coord_set, list) or len(coord_set) < 2:
-                    return jsonify({'error': 'Invalid coordinate format'}), 400
-                for coord in coord_set:
-                    lat, lng = float(coord[0]), float(coord[1])
-                    if not (-90 <= lat <= 90) or not (-180 <= lng <= 180):
-                        return jsonify({'error': 'Coordinate out of bounds'}), 400
-        except (ValueError, IndexError, TypeError):
-            return jsonify({'error': 'Invalid coordinates format'}), 400
+        rings = parse_rings(coords)
+        problems = geometry.validate(rings) if rings else ['Invalid boundary coordinates (min 3 points)']
+        if problems:
+            return jsonify({'error': problems[0], 'problems': problems}), 400
         
+        # area is measured here, never taken from the client
+        measured = geometry.measure(rings)
         boundary_data = {
             'pattaId': patta_id,
             'coordinates': coords,
-            'area': float(data.get('area', 0)),
+            'area': measured['area_m2'],
+            'perimeter': measured['perimeter_m'],
             'validated': True,
             'validatedBy': uid,
             'updatedAt': firestore.SERVER_TIMESTAMP,
-            'data_hash': sha256(str(sorted(coords)).encode()).hexdigest()  # Tamper-proof
+            'data_hash': geometry.boundary_hash(rings)  # Tamper-proof, vertex-order independent
         }
         
-        # Atomic write with audit
-        batch = db.batch()
-        batch.set(
-            db.collection('boundary_coordinates').document(patta_id),
-            boundary_data
-        )
-        batch.set(
-            db.collection('audit_trails').document(f"boundary_update_{patta_id}_{int(time.time())}"),
-            {
-                'action': 'boundary_updated',
-                'actorUid': uid,
-                'targetId': patta_id,
-                'timestamp': firestore.SERVER_TIMESTAMP,
-                'immutable': True,
-                'details': {'area': boundary_data['area']}
-            }
-        )
-        batch.commit()
+        db.collection('boundary_coordinates').document(patta_id).set(boundary_data)
+        audit.emit(db, 'audit_trails', {
+            'action': 'boundary_updated',
+            'actorUid': uid,
+            'targetId': patta_id,
+            'immutable': True,
+            'details': {'area': boundary_data['area']}
+        }, doc_id=f"boundary_update_{patta_id}_{int(time.time())}")
         
         return jsonify({'message': 'Boundary securely updated', 'pattaId': patta_id})
     
@@ -285,11 +268,10 @@ def upload_document(current_user, uid):
         blob.acl.all().grant_read()  # Public read for verification
         
         # Log upload to audit
-        db.collection('audit_trails').add({
+        audit.emit(db, 'audit_trails', {
             'action': 'document_uploaded',
             'actorUid': uid,
             'targetId': filename,
-            'timestamp': firestore.SERVER_TIMESTAMP,
             'details': {
                 'filename': filename,
                 'content_type': file.content_type,
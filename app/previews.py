@@ -0,0 +1,101 @@
+import importlib.util
+import os
+import shutil
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Pillow / PyMuPDF are optional and only imported by the worker threads;
+# without them previews are skipped and originals are still served
+HAVE_PIL = importlib.util.find_spec('PIL') is not None
+HAVE_FITZ = importlib.util.find_spec('fitz') is not None
+
+# variant -> longest edge in pixels
+VARIANTS = {'thumb': 320, 'preview': 1280}
+IMAGE_EXTS = {'.jpg', '.jpeg', '.png', '.webp', '.gif', '.bmp', '.tif', '.tiff'}
+
+
+class PreviewWorker:
+    """🖼️ Background pool that derives JPEG thumbnails and first-page previews.
+
+    Derived files live next to the original content-addressed object as
+    ``<object>.<variant>.jpg``, so they share its immutable cache lifetime
+    and are removed together with it.
+    """
+
+    def __init__(self, blobs, max_workers=2):
+        self.blobs = blobs
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='preview')
+        self._lock = threading.Lock()
+        self._pending = set()
+        self.pdftoppm = shutil.which('pdftoppm')
+
+    def path(self, name, variant):
+        return f"{self.blobs.path_for(name)}.{variant}.jpg"
+
+    def ready(self, name, variant):
+        return os.path.exists(self.path(name, variant))
+
+    def submit(self, name):
+        """Queue one object for rendering (no-op if done, in flight, or unsupported)"""
+        if not self.supports(name) or all(self.ready(name, v) for v in VARIANTS):
+            return
+        with self._lock:
+            if name in self._pending:
+                return
+            self._pending.add(name)
+        self._pool.submit(self._run, name)
+
+    def supports(self, name):
+        ext = os.path.splitext(name)[1].lower()
+        if ext in IMAGE_EXTS:
+            return HAVE_PIL
+        if ext == '.pdf':
+            return (HAVE_FITZ and HAVE_PIL) or self.pdftoppm is not None
+        return False
+
+    # ---------- RENDERING ----------
+
+    def _run(self, name):
+        try:
+            src = self.blobs.path_for(name)
+            if os.path.splitext(name)[1].lower() == '.pdf':
+                self._render_pdf(name, src)
+            else:
+                from PIL import Image
+                with Image.open(src) as img:
+                    self._save_variants(name, img)
+        except Exception as e:
+            print(f"❌ Preview failed for {name}: {e}")
+        finally:
+            with self._lock:
+                self._pending.discard(name)
+
+    def _render_pdf(self, name, src):
+        size = max(VARIANTS.values())
+        if HAVE_FITZ and HAVE_PIL:
+            import fitz  # PyMuPDF
+            from PIL import Image
+            with fitz.open(src) as doc:
+                page = doc.load_page(0)
+                zoom = size / max(page.rect.width, page.rect.height)
+                pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+                self._save_variants(name, Image.frombytes('RGB', (pix.width, pix.height), pix.samples))
+            return
+        for variant, edge in VARIANTS.items():
+            out = self.path(name, variant)
+            prefix = f"{out}.tmp"
+            subprocess.run(
+                [self.pdftoppm, '-jpeg', '-f', '1', '-l', '1', '-scale-to', str(edge), '-singlefile', src, prefix],
+                check=True, timeout=60, capture_output=True
+            )
+            os.replace(prefix + '.jpg', out)
+
+    def _save_variants(self, name, img):
+        img = img.convert('RGB')
+        for variant, edge in sorted(VARIANTS.items(), key=lambda v: -v[1]):
+            img.thumbnail((edge, edge))
+            out = self.path(name, variant)
+            tmp = f"{out}.tmp"
+            img.save(tmp, 'JPEG', quality=80, optimize=True)
+            os.replace(tmp, out)
@@ -0,0 +1,179 @@
+import logging
+import math
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import zlib
+
+logger = logging.getLogger(__name__)
+
+SWEEP_EVERY = 1000   # hits between expired-key sweeps
+
+
+def _slide(state, now, window):
+    """Roll a ``(window_idx, prev, curr)`` counter forward to ``now``"""
+    idx = int(now // window)
+    if state is None or state[0] < idx - 1:
+        return idx, 0, 0
+    if state[0] == idx - 1:
+        return idx, state[2], 0
+    return state
+
+
+def _decide(state, now, window, limit):
+    """Sliding-window-counter estimate: 0 if the hit is allowed, else seconds to wait.
+
+    The previous fixed window is weighted by how much of it still overlaps
+    the sliding window, so only two integers are kept per key.
+    """
+    idx, prev, curr = state
+    elapsed = now - idx * window
+    if prev * (1 - elapsed / window) + curr < limit:
+        return 0
+    if curr >= limit or not prev:
+        wait = window - elapsed
+    else:
+        # prev * (1 - t / window) + curr < limit  =>  t > window * (1 - (limit - curr) / prev)
+        wait = window * (1 - (limit - curr) / prev) - elapsed
+    return max(1, math.ceil(wait))
+
+
+class MemoryBackend:
+    """Per-process counters, sharded so concurrent threads rarely share a lock"""
+
+    def __init__(self, shards=16):
+        self._shards = [({}, threading.Lock()) for _ in range(shards)]
+        self._hits = 0
+
+    def hit(self, key, limit, window):
+        now = time.time()
+        table, lock = self._shards[zlib.crc32(key.encode()) % len(self._shards)]
+        with lock:
+            entry = table.get(key)
+            state = _slide(entry[:3] if entry else None, now, window)
+            retry_after = _decide(state, now, window, limit)
+            idx, prev, curr = state
+            if not retry_after:
+                curr += 1
+            # after two windows a key carries no information
+            table[key] = (idx, prev, curr, now + 2 * window)
+
+        self._hits += 1
+        if self._hits % SWEEP_EVERY == 0:
+            self.sweep(now)
+        return retry_after
+
+    def sweep(self, now=None):
+        now = now or time.time()
+        for table, lock in self._shards:
+            with lock:
+                for key in [k for k, v in table.items() if v[3] < now]:
+                    del table[key]
+
+    def __len__(self):
+        return sum(len(table) for table, _ in self._shards)
+
+
+class SQLiteBackend:
+    """Counters in one SQLite file on tmpfs, shared by every worker on the node"""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._hits = 0
+        self._conn().execute(
+            'CREATE TABLE IF NOT EXISTS hits ('
+            ' key TEXT PRIMARY KEY, idx INTEGER, prev INTEGER, curr INTEGER, expires REAL)'
+        )
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=1.0, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=OFF')
+            self._local.conn = conn
+        return conn
+
+    def hit(self, key, limit, window):
+        now = time.time()
+        conn = self._conn()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                row = conn.execute('SELECT idx, prev, curr FROM hits WHERE key = ?', (key,)).fetchone()
+                state = _slide(row, now, window)
+                retry_after = _decide(state, now, window, limit)
+                idx, prev, curr = state
+                if not retry_after:
+                    curr += 1
+                conn.execute('INSERT OR REPLACE INTO hits VALUES (?, ?, ?, ?, ?)',
+                             (key, idx, prev, curr, now + 2 * window))
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+        except sqlite3.Error as e:
+            # fail open: a busy limiter must not take the site down
+            logger.warning(f"Rate limiter unavailable: {e}")
+            return 0
+
+        self._hits += 1
+        if self._hits % SWEEP_EVERY == 0:
+            self.sweep(now)
+        return retry_after
+
+    def sweep(self, now=None):
+        try:
+            self._conn().execute('DELETE FROM hits WHERE expires < ?', (now or time.time(),))
+        except sqlite3.Error:
+            pass
+
+    def __len__(self):
+        return self._conn().execute('SELECT COUNT(*) FROM hits').fetchone()[0]
+
+
+def default_path():
+    """tmpfs when available so the shared counters never touch a disk"""
+    base = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+    return os.path.join(base, 'patta_ratelimit.db')
+
+
+class RateLimiter:
+    """⏱️ One limiter engine for every ``rate_limit`` decorator.
+
+    ``RATE_LIMIT_BACKEND=shared`` (default) keeps the counters in SQLite on
+    tmpfs so all gunicorn workers on a node enforce one limit;
+    ``memory`` keeps them per process.
+    """
+
+    def __init__(self, backend=None):
+        self._backend = backend
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            kind = os.environ.get('RATE_LIMIT_BACKEND', 'shared')
+            if kind == 'shared':
+                try:
+                    self._backend = SQLiteBackend(os.environ.get('RATE_LIMIT_DB') or default_path())
+                except sqlite3.Error as e:
+                    logger.warning(f"Shared rate limiter unavailable ({e}), using per-process limits")
+                    self._backend = MemoryBackend()
+            else:
+                self._backend = MemoryBackend()
+        return self._backend
+
+    def hit(self, key, limit, window):
+        """Count one request for ``key``; returns 0 if allowed, else Retry-After seconds"""
+        return self.backend.hit(key, limit, window)
+
+
+limiter = RateLimiter()
+
+
+def scope_for(f):
+    """Each decorated view gets its own budget"""
+    return f"{f.__module__}.{f.__name__}"
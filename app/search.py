@@ -0,0 +1,159 @@
+import heapq
+import re
+import threading
+import unicodedata
+
+# Separators only: \w would split Tamil words at their vowel signs
+TOKEN_SPLIT = re.compile(r'[\s,;:@/\\\-_.()\[\]]+')
+
+FIELD_WEIGHTS = {
+    'ref_id': 5.0,
+    'surveyNo': 4.0,
+    'citizen_email': 3.0,
+    'subdivNo': 3.0,
+    'village': 2.0,
+    'taluk': 2.0,
+    'district': 1.0,
+}
+
+PREFIX_WEIGHT = 0.5       # a prefix hit counts half of an exact token hit
+MIN_PREFIX = 2
+MAX_EXPANSIONS = 50       # tokens a single prefix may expand to
+
+
+def normalize(text):
+    return unicodedata.normalize('NFC', str(text)).casefold().strip()
+
+
+def tokenize(text):
+    """Whole value plus its separator-split parts, e.g. 'a/45' -> a/45, a, 45"""
+    text = normalize(text)
+    if not text:
+        return []
+    tokens = [t for t in TOKEN_SPLIT.split(text) if t]
+    if text not in tokens:
+        tokens.append(text)
+    return tokens
+
+
+class SearchIndex:
+    """🔎 Inverted index plus prefix trie over the fields staff search by.
+
+    ``postings`` maps a token to ``{ref_id: weight}``. Every trie node keeps
+    the set of tokens below it, so expanding a prefix costs O(len(prefix) +
+    matches) no matter how many applications exist.
+    """
+
+    def __init__(self, fields=FIELD_WEIGHTS):
+        self.fields = fields
+        self._lock = threading.Lock()
+        self.rebuild([])
+
+    def attach(self, store):
+        self.rebuild(store)
+        store.add_listener(self.on_change)
+
+    def rebuild(self, applications):
+        with self._lock:
+            self._postings = {}
+            self._doc_tokens = {}
+            self._trie = {}
+            for application in applications:
+                self._add(application)
+
+    def on_change(self, old, new):
+        with self._lock:
+            if old is not None:
+                self._remove(old['ref_id'])
+            if new is not None:
+                self._add(new)
+
+    # ---------- QUERY ----------
+
+    def search(self, query, limit=50, accept=None):
+        """Ranked ref_ids: documents matching more terms first, then by score.
+
+        ``accept(ref_id)`` can narrow the hits (e.g. by status) before ranking.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+
+        with self._lock:
+            matched = {}
+            scores = {}
+            for term in terms:
+                best = {}
+                for ref_id, weight in self._postings.get(term, {}).items():
+                    best[ref_id] = weight
+                if len(term) >= MIN_PREFIX:
+                    for token in self._expand(term):
+                        if token == term:
+                            continue
+                        for ref_id, weight in self._postings[token].items():
+                            score = weight * PREFIX_WEIGHT
+                            if score > best.get(ref_id, 0):
+                                best[ref_id] = score
+                for ref_id, score in best.items():
+                    matched[ref_id] = matched.get(ref_id, 0) + 1
+                    scores[ref_id] = scores.get(ref_id, 0) + score
+
+        if accept:
+            scores = {r: s for r, s in scores.items() if accept(r)}
+        return heapq.nlargest(limit, scores, key=lambda r: (matched[r], scores[r], r))
+
+    def _expand(self, prefix):
+        node = self._trie
+        for ch in prefix:
+            node = node.get(ch)
+            if node is None:
+                return []
+        tokens = node.get('', ())
+        if len(tokens) > MAX_EXPANSIONS:
+            return heapq.nsmallest(MAX_EXPANSIONS, tokens, key=len)
+        return tokens
+
+    # ---------- MAINTENANCE ----------
+
+    def _add(self, application):
+        ref_id = application['ref_id']
+        doc = {}
+        for field, weight in self.fields.items():
+            for token in tokenize(application.get(field) or ''):
+                doc[token] = max(doc.get(token, 0), weight)
+        self._doc_tokens[ref_id] = doc
+        for token, weight in doc.items():
+            posting = self._postings.get(token)
+            if posting is None:
+                posting = self._postings[token] = {}
+                self._trie_add(token)
+            posting[ref_id] = weight
+
+    def _remove(self, ref_id):
+        for token in self._doc_tokens.pop(ref_id, {}):
+            posting = self._postings.get(token)
+            if posting is None:
+                continue
+            posting.pop(ref_id, None)
+            if not posting:
+                del self._postings[token]
+                self._trie_remove(token)
+
+    def _trie_add(self, token):
+        node = self._trie
+        for ch in token:
+            node = node.setdefault(ch, {})
+            node.setdefault('', set()).add(token)
+
+    def _trie_remove(self, token):
+        path = [self._trie]
+        for ch in token:
+            node = path[-1].get(ch)
+            if node is None:
+                return
+            path.append(node)
+        for depth in range(len(token), 0, -1):
+            node = path[depth]
+            node[''].discard(token)
+            if not node['']:
+                del path[depth - 1][token[depth - 1]]
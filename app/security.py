@@ -1,5 +1,4 @@
 import re
-import time
 from collections import defaultdict
 from functools import wraps
 from flask import request, abort, jsonify, session, g
@@ -11,36 +10,31 @@ import secrets
 import logging
 from datetime import datetime, timedelta
 
+from .ratelimit import limiter, scope_for
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# In-memory rate limiting
-rate_limits = defaultdict(list)
+# Rate limiting (counters shared by all workers, see ratelimit.py)
 failed_logins = defaultdict(list)
 
 def rate_limit(key_type="ip", limit=100, window=3600):
     """Enhanced rate limiting decorator"""
     def decorator(f):
+        scope = scope_for(f)
         @wraps(f)
         def decorated_function(*args, **kwargs):
             client_key = request.remote_addr if key_type == "ip" else key_type
-            now = time.time()
-            
-            # Clean expired requests
-            rate_limits[client_key] = [
-                req_time for req_time in rate_limits[client_key] 
-                if now - req_time < window
-            ]
             
-            if len(rate_limits[client_key]) >= limit:
+            retry_after = limiter.hit(f"{scope}:{client_key}", limit, window)
+            if retry_after:
                 logger.warning(f"Rate limit exceeded for {client_key}")
                 response = jsonify({'error': 'Too many requests. Try again later.'})
                 response.status_code = 429
-                response.headers['Retry-After'] = str(window)
+                response.headers['Retry-After'] = str(retry_after)
                 return response
             
-            rate_limits[client_key].append(now)
             return f(*args, **kwargs)
         return decorated_function
     return decorator
@@ -88,7 +82,7 @@ CSP = (
     "style-src 'self' 'unsafe-inline' https://unpkg.com https://cdnjs.cloudflare.com https://fonts.googleapis.com https://cdn.tailwindcss.com; "
     "font-src 'self' https://fonts.gstatic.com data:; "
     "img-src 'self' data: https: blob: https://*.tile.openstreetmap.org https://*.googleusercontent.com https://lh3.googleusercontent.com; "
-    "connect-src 'self' https://nominatim.openstreetmap.org https://tile.openstreetmap.org https://*.googleapis.com https://*.google.com https://ipapi.co; "
+    "connect-src 'self' https://tile.openstreetmap.org https://*.googleapis.com https://*.google.com https://ipapi.co; "
     "frame-src 'self' https://*.google.com; "
     "frame-ancestors 'none';"
 )
@@ -0,0 +1,77 @@
+import atexit
+import threading
+
+from .cache import TTLCache
+
+# uid -> Firestore user profile
+profiles = TTLCache(maxsize=10000, ttl=60)
+# Firebase ID token -> uid (never cached past the token's own expiry)
+verified_tokens = TTLCache(maxsize=10000, ttl=300)
+
+FIRESTORE_BATCH_LIMIT = 500
+
+
+def load_profile(db, uid):
+    """👤 User document from cache, or one Firestore read (None if missing)"""
+    def fetch():
+        doc = db.collection('users').document(uid).get()
+        return doc.to_dict() if doc.exists else None
+    return profiles.get_or_load(uid, fetch)
+
+
+def invalidate(uid, token=None):
+    """Forget a user's cached profile and tokens (logout, login, role change)"""
+    profiles.pop(uid)
+    if token:
+        verified_tokens.pop(token)
+    verified_tokens.discard_where(lambda cached_uid: cached_uid == uid)
+
+
+class ActivityWriter:
+    """⏳ Coalesces per-request ``last_activity`` updates into periodic batched writes.
+
+    Only the latest fields per user are kept, so a user making a hundred
+    requests between flushes costs one Firestore write.
+    """
+
+    def __init__(self, interval=30):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._db = None
+        self._wake = threading.Event()
+        self._thread = None
+        atexit.register(self.flush)
+
+    def record(self, db, uid, fields):
+        with self._lock:
+            self._db = db
+            self._pending.setdefault(uid, {}).update(fields)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name='activity-writer', daemon=True)
+                self._thread.start()
+
+    def _loop(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            db = self._db
+        if not pending or db is None:
+            return
+        items = list(pending.items())
+        try:
+            for start in range(0, len(items), FIRESTORE_BATCH_LIMIT):
+                batch = db.batch()
+                for uid, fields in items[start:start + FIRESTORE_BATCH_LIMIT]:
+                    batch.update(db.collection('users').document(uid), fields)
+                batch.commit()
+        except Exception as e:
+            print(f"❌ Activity flush failed ({len(items)} users): {e}")
+
+
+activity = ActivityWriter()
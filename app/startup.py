@@ -0,0 +1,111 @@
+import importlib
+import sys
+import threading
+import time
+
+
+class LazyModule:
+    """Module imported on first attribute access (``firestore.SERVER_TIMESTAMP``)"""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+
+class LazyObject:
+    """Client built by ``factory()`` on first use, e.g. the Firestore client"""
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._obj = None
+        self._lock = threading.Lock()
+
+    def resolve(self):
+        if self._obj is None:
+            with self._lock:
+                if self._obj is None:
+                    self._obj = self._factory()
+        return self._obj
+
+    def __getattr__(self, attr):
+        return getattr(self.resolve(), attr)
+
+
+# ---------- IMPORT-TIME REPORT ----------
+
+class _TimedLoader:
+    def __init__(self, timer, name, loader):
+        self._timer = timer
+        self._name = name
+        self._loader = loader
+
+    def __getattr__(self, attr):
+        return getattr(self._loader, attr)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        timer = self._timer
+        timer._stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            total = time.perf_counter() - start
+            children = timer._stack.pop()
+            if timer._stack:
+                timer._stack[-1] += total
+            timer.records.append((self._name, total, total - children))
+
+
+class ImportTimer:
+    """⏱️ Records how long each module takes to import (cumulative and self).
+
+    Installed first thing when STARTUP_REPORT=1 so cold-start cost can be
+    traced to the modules that cause it.
+    """
+
+    def __init__(self):
+        self.records = []
+        self._stack = []
+        self.started = time.perf_counter()
+
+    def install(self):
+        sys.meta_path.insert(0, self)
+        return self
+
+    def uninstall(self):
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def find_spec(self, name, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(name, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+                    spec.loader = _TimedLoader(self, name, spec.loader)
+                return spec
+        return None
+
+    def report(self, top=15):
+        """Slowest top-level packages plus the slowest individual modules"""
+        by_package = {}
+        for name, _, own in self.records:
+            package = name.split('.')[0]
+            by_package[package] = by_package.get(package, 0.0) + own
+        lines = [f"⏱️ Startup {time.perf_counter() - self.started:.3f}s, "
+                 f"{len(self.records)} modules imported"]
+        for package, seconds in sorted(by_package.items(), key=lambda p: -p[1])[:top]:
+            lines.append(f"   {seconds * 1000:8.1f} ms  {package}")
+        lines.append("   slowest modules (cumulative / self):")
+        for name, total, own in sorted(self.records, key=lambda r: -r[1])[:top]:
+            lines.append(f"   {total * 1000:8.1f} / {own * 1000:6.1f} ms  {name}")
+        return '\n'.join(lines)
@@ -12,7 +12,7 @@ class SecurePattaPWA {
       script-src 'self' 'unsafe-inline' https://unpkg.com https://cdnjs.cloudflare.com;
       style-src 'self' 'unsafe-inline' https://unpkg.com https://fonts.googleapis.com https://cdn.tailwindcss.com;
       img-src 'self' data: https: blob: https://*.tile.openstreetmap.org https://*.googleusercontent.com;
-      connect-src 'self' https://nominatim.openstreetmap.org https://ipapi.co https://*.googleapis.com;
+      connect-src 'self' https://ipapi.co https://*.googleapis.com;
       form-action 'self';
       frame-ancestors 'none';
     `;
@@ -0,0 +1,245 @@
+import threading
+from collections import OrderedDict
+from bisect import bisect_left, bisect_right, insort
+
+
+class ApplicationStore:
+    """🗂️ In-memory Patta applications with hash and bucket indexes.
+
+    ``ref_id`` and lower-cased ``citizen_email`` are hash indexes, ``status``,
+    ``district``, ``taluk`` and ``village`` are bucket indexes. All of them
+    are kept up to date by ``insert`` and ``update``, so lookups cost O(1) or
+    O(result size) instead of a scan over every application.
+    ``submitted_at`` and ``district`` also have sorted indexes that back
+    cursor pagination.
+
+    Every insert, update and removal stamps a new store-wide revision (kept
+    in the application's ``rev`` field) so clients can ask for just the
+    changes since the revision they last saw.
+    """
+
+    BUCKET_FIELDS = ('status', 'district', 'taluk', 'village')
+    SORT_FIELDS = ('submitted_at', 'district')
+    MAX_CHANGES = 1000
+
+    def __init__(self, applications=None):
+        self._lock = threading.RLock()
+        self._listeners = []
+        self.load(applications or [])
+
+    # ---------- LOADING ----------
+
+    def load(self, applications):
+        """Replace the whole contents and rebuild every index"""
+        with self._lock:
+            self._by_ref = {}
+            self._pos = {}
+            self._by_email = {}
+            self._buckets = {field: {} for field in self.BUCKET_FIELDS}
+            self._sorted = {field: [] for field in self.SORT_FIELDS}
+            self._next_pos = 0
+            self._changes = OrderedDict()   # ref_id -> rev, oldest change first
+            self._tombstones = set()
+            for application in applications:
+                self._index(application)
+            self.rev = max((a.get('rev', 0) for a in applications), default=0)
+            # Removals before this point were not tracked: older clients must resync
+            self.horizon = self.rev
+            for application in sorted(applications, key=lambda a: a.get('rev', 0)):
+                self._changes[application['ref_id']] = application.get('rev', 0)
+
+    def add_listener(self, fn):
+        """``fn(old, new)`` runs after every insert (old is None), update and removal (new is None).
+
+        Listeners run under the store lock, so they see changes one at a time in
+        revision order and ``new`` is exactly the state that change produced.
+        Keep them quick and never block on another thread that writes to the store.
+        """
+        self._listeners.append(fn)
+
+    # ---------- READS ----------
+
+    def __len__(self):
+        return len(self._by_ref)
+
+    def __iter__(self):
+        return iter(list(self._by_ref.values()))
+
+    def __contains__(self, ref_id):
+        return ref_id in self._by_ref
+
+    def get(self, ref_id):
+        return self._by_ref.get(ref_id)
+
+    def by_email(self, email):
+        """Applications of one citizen, in submission order"""
+        return self._ordered(self._by_email.get((email or '').lower(), {}))
+
+    def find(self, **filters):
+        """Applications matching every ``field=value`` filter on the bucket fields"""
+        filters = {k: v for k, v in filters.items() if v}
+        if not filters:
+            return list(self)
+        buckets = []
+        for field, value in filters.items():
+            if field not in self._buckets:
+                raise ValueError(f'{field} is not indexed')
+            bucket = self._buckets[field].get(value)
+            if not bucket:
+                return []
+            buckets.append(bucket)
+        buckets.sort(key=len)
+        smallest, rest = buckets[0], buckets[1:]
+        return self._ordered({
+            ref_id: application for ref_id, application in smallest.items()
+            if all(ref_id in bucket for bucket in rest)
+        })
+
+    def count(self, field, value):
+        return len(self._buckets[field].get(value, ()))
+
+    def page(self, sort_field, descending=False, after=None, limit=50, predicate=None):
+        """Walk the ``sort_field`` index starting just past the ``after`` key.
+
+        Returns ``(items, next_key)``; ``next_key`` is None on the last page.
+        """
+        with self._lock:
+            keys = self._sorted[sort_field]
+            after = tuple(after) if after else None
+            if descending:
+                start = (bisect_left(keys, after) if after else len(keys)) - 1
+                positions = range(start, -1, -1)
+            else:
+                start = bisect_right(keys, after) if after else 0
+                positions = range(start, len(keys))
+
+            items, last_key = [], None
+            for i in positions:
+                application = self._by_ref[keys[i][1]]
+                if predicate and not predicate(application):
+                    continue
+                if len(items) == limit:
+                    return items, last_key
+                items.append(application)
+                last_key = keys[i]
+            return items, None
+
+    def changes_since(self, since):
+        """Applications changed and ref_ids removed after revision ``since``.
+
+        Returns ``(changed, removed, reset)``; ``reset`` means the client is
+        too far behind (or ahead, after a restart) and must reload everything.
+        """
+        with self._lock:
+            if since < self.horizon or since > self.rev:
+                return [], [], True
+            changed, removed = [], []
+            for ref_id, rev in reversed(self._changes.items()):
+                if rev <= since:
+                    break
+                if len(changed) + len(removed) >= self.MAX_CHANGES:
+                    return [], [], True
+                if ref_id in self._tombstones:
+                    removed.append(ref_id)
+                else:
+                    changed.append(self._by_ref[ref_id])
+            changed.reverse()
+            removed.reverse()
+            return changed, removed, False
+
+    # ---------- WRITES ----------
+
+    def insert(self, application):
+        with self._lock:
+            if application['ref_id'] in self._by_ref:
+                raise KeyError(f"{application['ref_id']} already exists")
+            self._tombstones.discard(application['ref_id'])
+            application['rev'] = self._bump(application['ref_id'])
+            self._index(application)
+            self._notify(None, application)
+        return application
+
+    def update(self, ref_id, changes):
+        """Apply ``changes`` to one application and re-index it. Returns it, or None"""
+        with self._lock:
+            application = self._by_ref.get(ref_id)
+            if application is None:
+                return None
+            old = dict(application)
+            self._unindex(application)
+            application.update(changes)
+            application['rev'] = self._bump(ref_id)
+            self._index(application, self._pos[ref_id])
+            self._notify(old, application)
+        return application
+
+    def remove(self, ref_id):
+        """Drop one application, leaving a tombstone for delta sync. Returns it, or None"""
+        with self._lock:
+            application = self._by_ref.get(ref_id)
+            if application is None:
+                return None
+            self._unindex(application)
+            del self._by_ref[ref_id]
+            del self._pos[ref_id]
+            self._tombstones.add(ref_id)
+            self._bump(ref_id)
+            self._notify(application, None)
+        return application
+
+    # ---------- INTERNALS ----------
+
+    def _bump(self, ref_id):
+        self.rev += 1
+        self._changes[ref_id] = self.rev
+        self._changes.move_to_end(ref_id)
+        return self.rev
+
+    def _index(self, application, pos=None):
+        ref_id = application['ref_id']
+        if pos is None:
+            pos = self._next_pos
+            self._next_pos += 1
+        self._by_ref[ref_id] = application
+        self._pos[ref_id] = pos
+        email = (application.get('citizen_email') or '').lower()
+        self._by_email.setdefault(email, {})[ref_id] = application
+        for field in self.BUCKET_FIELDS:
+            self._buckets[field].setdefault(application.get(field), {})[ref_id] = application
+        for field in self.SORT_FIELDS:
+            insort(self._sorted[field], self._sort_key(application, field))
+
+    def _unindex(self, application):
+        ref_id = application['ref_id']
+        email = (application.get('citizen_email') or '').lower()
+        self._discard(self._by_email, email, ref_id)
+        for field in self.BUCKET_FIELDS:
+            self._discard(self._buckets[field], application.get(field), ref_id)
+        for field in self.SORT_FIELDS:
+            keys = self._sorted[field]
+            key = self._sort_key(application, field)
+            i = bisect_left(keys, key)
+            if i < len(keys) and keys[i] == key:
+                del keys[i]
+
+    @staticmethod
+    def _sort_key(application, field):
+        return (str(application.get(field) or ''), application['ref_id'])
+
+    @staticmethod
+    def _discard(index, key, ref_id):
+        bucket = index.get(key)
+        if bucket is not None:
+            bucket.pop(ref_id, None)
+            if not bucket:
+                del index[key]
+
+    def _ordered(self, bucket):
+        return sorted(bucket.values(), key=lambda a: self._pos[a['ref_id']])
+
+    def _notify(self, old, new):
+        for fn in self._listeners:
+            try:
+                fn(old, new)
+            except Exception as e:
+                print(f"❌ Store listener failed: {e}")
@@ -0,0 +1,171 @@
+import hashlib
+import json
+import math
+import threading
+
+from . import geometry
+from .cache import TTLCache
+from .geo import locate
+
+TILE_PX = 256
+MAX_ZOOM = 20
+DETAIL_ZOOM = 15          # from here parcels are drawn one by one instead of clustered
+MAX_DETAIL = 1000         # ...unless a tile holds more than this
+MAX_DROP = 256            # a change touching more tiles than this drops its whole zoom level
+CLUSTER_PX = 64           # cluster cell size on screen
+PROPERTIES = ('ref_id', 'status', 'village', 'surveyNo', 'subdivNo')
+
+
+def tile_bounds(z, x, y):
+    """``(south, west, north, east)`` of a Web Mercator (slippy map) tile"""
+    n = 2 ** z
+
+    def lat(row):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / n))))
+
+    return lat(y + 1), x / n * 360 - 180, lat(y), (x + 1) / n * 360 - 180
+
+
+def world_px(lat, lng, z):
+    """Global pixel position of a point at zoom ``z``"""
+    size = TILE_PX * 2 ** z
+    lat = max(-85.0511, min(85.0511, lat))
+    s = math.sin(math.radians(lat))
+    return (lng + 180) / 360 * size, (0.5 - math.log((1 + s) / (1 - s)) / (4 * math.pi)) * size
+
+
+def tiles_covering(box, z):
+    """``(xs, ys)`` ranges of the tiles at zoom ``z`` touched by a bounding box"""
+    s, w, n, e = box
+    last = 2 ** z - 1
+    x0, y0 = world_px(n, w, z)
+    x1, y1 = world_px(s, e, z)
+    xs = range(max(0, int(x0 // TILE_PX)), min(last, int(x1 // TILE_PX)) + 1)
+    ys = range(max(0, int(y0 // TILE_PX)), min(last, int(y1 // TILE_PX)) + 1)
+    return xs, ys
+
+
+def metres_per_px(lat, z):
+    return 2 * math.pi * geometry.EARTH_RADIUS_M * math.cos(math.radians(lat)) / (TILE_PX * 2 ** z)
+
+
+class TileCache:
+    """🧱 Map tiles of applications: clustered markers when zoomed out,
+    simplified boundaries when zoomed in.
+
+    Tiles are built from the grid index on first request (or ahead of time
+    by ``warm``) and served from memory with an ETag. Any change to a
+    located application drops exactly the tiles its old and new positions
+    touch, at every zoom level.
+    """
+
+    def __init__(self, geo_index, store, maxsize=20000, ttl=24 * 3600):
+        self.geo_index = geo_index
+        self.store = store
+        self.tiles = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.generation = 0
+        self._lock = threading.Lock()
+
+    def attach(self, store):
+        """Follow the store (attach after the geo index, so rebuilt tiles see the change)"""
+        store.add_listener(self.on_change)
+
+    def on_change(self, old, new):
+        if old is not None and new is not None and all(
+                old.get(f) == new.get(f) for f in PROPERTIES + ('lat', 'lng', 'boundary')):
+            return  # nothing a tile shows has changed
+        boxes = [entry[0] for entry in (locate(a) for a in (old, new) if a is not None) if entry]
+        if not boxes:
+            return
+        with self._lock:
+            self.generation += 1
+        for box in boxes:
+            for z in range(MAX_ZOOM + 1):
+                xs, ys = tiles_covering(box, z)
+                if len(xs) * len(ys) > MAX_DROP:
+                    self.tiles.discard_where(lambda tile, z=z: tile['zoom'] == z)
+                    continue
+                for x in xs:
+                    for y in ys:
+                        self.tiles.pop((z, x, y))
+
+    def get(self, z, x, y):
+        """``{'body', 'zoom', 'etag'}`` for one tile"""
+        key = (z, x, y)
+        tile = self.tiles.get(key)
+        if tile is None:
+            generation = self.generation
+            tile = self._build(z, x, y)
+            with self._lock:
+                # an application changed while we were building: serve it, don't keep it
+                if generation == self.generation:
+                    self.tiles.set(key, tile)
+        return tile
+
+    def warm(self, max_zoom=8):
+        """Build every non-empty tile up to ``max_zoom`` in the background"""
+        def run():
+            located = self.geo_index.entries([a['ref_id'] for a in self.store])
+            built = 0
+            for z in range(max_zoom + 1):
+                keys = {tuple(int(v // TILE_PX) for v in world_px(*centroid, z))
+                        for _, (_, centroid, _) in located}
+                for x, y in keys:
+                    self.get(z, x, y)
+                built += len(keys)
+            print(f"🧱 Map tiles warmed: {built} tiles up to zoom {max_zoom}")
+        threading.Thread(target=run, daemon=True, name='tile-warm').start()
+
+    # ---------- BUILD ----------
+
+    def _build(self, z, x, y):
+        box = tile_bounds(z, x, y)
+        entries = self.geo_index.entries(self.geo_index.within_bbox(*box))
+        if z >= DETAIL_ZOOM and len(entries) <= MAX_DETAIL:
+            features = self._parcels(entries, z, box)
+        else:
+            features = self._clusters(entries, z, box)
+        body = json.dumps({'type': 'FeatureCollection', 'zoom': z, 'features': features},
+                          separators=(',', ':')).encode()
+        return {'body': body, 'zoom': z, 'etag': hashlib.sha256(body).hexdigest()[:32]}
+
+    def _properties(self, ref_id):
+        application = self.store.get(ref_id) or {}
+        return {k: application.get(k) for k in PROPERTIES}
+
+    def _parcels(self, entries, z, box):
+        tolerance = metres_per_px((box[0] + box[2]) / 2, z)
+        features = []
+        for ref_id, (_, centroid, rings) in entries:
+            polygons = [r for r in (geometry.simplify(ring, tolerance) for ring in rings) if len(r) >= 3]
+            if polygons:
+                shape = geometry.to_geojson([r.round(7) for r in polygons])
+            else:
+                shape = {'type': 'Point', 'coordinates': [centroid[1], centroid[0]]}
+            features.append({'type': 'Feature', 'id': ref_id, 'geometry': shape,
+                             'properties': self._properties(ref_id)})
+        return features
+
+    def _clusters(self, entries, z, box):
+        # centroids only, so a parcel on a tile edge is counted in one tile
+        s, w, n, e = box
+        cells = {}
+        for ref_id, (_, (lat, lng), _) in entries:
+            if not (s <= lat < n and w <= lng < e):
+                continue
+            px, py = world_px(lat, lng, z)
+            cell = cells.setdefault((int(px // CLUSTER_PX), int(py // CLUSTER_PX)), [0, 0.0, 0.0, {}, ref_id])
+            cell[0] += 1
+            cell[1] += lat
+            cell[2] += lng
+            status = (self.store.get(ref_id) or {}).get('status', 'pending')
+            cell[3][status] = cell[3].get(status, 0) + 1
+        features = []
+        for count, lat, lng, statuses, ref_id in cells.values():
+            properties = {'cluster': count > 1, 'count': count, 'statuses': statuses}
+            if count == 1:
+                properties.update(self._properties(ref_id))
+            features.append({'type': 'Feature',
+                             'geometry': {'type': 'Point', 'coordinates': [round(lng / count, 7), round(lat / count, 7)]},
+                             'properties': properties})
+        return features
@@ -0,0 +1,15 @@
+import os
+
+# 🔥 ONE worker process: the application store, journal, ref_id counter, job queue,
+# blob manifest, event bus and audit spool all live in this process's memory.
+# A second worker would replay and compact the same journal files on its own,
+# hand out the same ref_ids and never see the other's writes - scale with threads.
+workers = 1
+
+# Threaded worker: a dashboard's live-update stream holds one thread, not the whole worker
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 16))
+timeout = 120
+
+# dashboards only open /api/events/stream when the server runs threaded workers
+raw_env = ['LIVE_UPDATES=1']
@@ -3,4 +3,5 @@ from app import create_app
 app = create_app()
 
 if __name__ == '__main__':
+    app.config['LIVE_UPDATES'] = True   # the dev server runs a thread per request
     app.run(debug=True, host='0.0.0.0', port=5000)
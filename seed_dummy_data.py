@@ -1,9 +1,11 @@
 import firebase_admin
 from firebase_admin import credentials, firestore
+import math
 import random
 from datetime import datetime
 import os
 from dotenv import load_dotenv
+from app.geometry import encode_boundary
 
 load_dotenv()
 
@@ -39,13 +41,14 @@ def seed_patta(users):
         lat = 13.0827 + random.uniform(-0.005, 0.005)
         lng = 80.2707 + random.uniform(-0.005, 0.005)
         
-        # ✅ FIXED: Flat array of coordinates (no nesting)
+        # ✅ Vertices around the centre in angle order (a simple polygon), stored as an encoded polyline
         boundary_points = []
-        for _ in range(random.randint(4, 8)):
-            boundary_points.append({
-                'lat': lat + random.uniform(-0.0002, 0.0002),
-                'lng': lng + random.uniform(-0.0002, 0.0002)
-            })
+        for angle in sorted(random.uniform(0, 360) for _ in range(random.randint(4, 8))):
+            radius = random.uniform(0.0001, 0.0002)
+            boundary_points.append([
+                lat + radius * math.sin(math.radians(angle)),
+                lng + radius * math.cos(math.radians(angle))
+            ])
         
         db.collection('patta').document(ref_id).set({
             'ref_id': ref_id,
@@ -57,7 +60,7 @@ def seed_patta(users):
             'lng': round(lng, 10),
             'surveyNo': f"{random.randint(100, 999)}/{random.choice(['1A','2B','3C'])}",
             'subdivNo': random.randint(1, 4),
-            'boundary': boundary_points,  # ✅ Flat array of objects
+            'boundary': encode_boundary([boundary_points]),  # ✅ {'encoding': 'polyline7', 'rings': [...]}
             'status': random.choices(['pending', 'approved', 'rejected'], weights=[0.6, 0.3, 0.1])[0],
             'submitted_at': firestore.SERVER_TIMESTAMP,
             'staff_notes': random.choice(['Verified', 'Field visit needed', ''])